@@ -0,0 +1,235 @@
+# lib/analytics.py
+#
+# Institution-wide grade analytics. The "numpy" engine loads every grade into contiguous arrays
+# in one bulk fetch and computes letter buckets, GPAs, distributions and percentiles for all
+# students and courses at once. The "python" engine produces the same numbers by streaming rows
+# through a Python loop and is used when NumPy isn't installed (it's an optional dependency).
+
+from bisect import bisect_right
+from sqlalchemy import func, select, text
+from models import Student, Course, Grade
+from gpa import GRADE_SCALE, score_points, gpa_from_totals
+from rows import connection_for, iter_rows
+from settings import ANALYTICS_ENGINE
+
+# Imported by numpy_available() on first use: it's optional and slow to import
+np = None
+
+ENGINES = ('python', 'numpy')
+
+# Earlier name of the python engine, still accepted from existing configs
+RENAMED_ENGINES = {'sql': 'python'}
+
+# Letter buckets from lowest to highest: bucket i covers scores in [CUTOFFS[i-1], CUTOFFS[i])
+LETTERS = [letter for _, letter, _ in reversed(GRADE_SCALE)]
+POINTS = [points for _, _, points in reversed(GRADE_SCALE)]
+CUTOFFS = [cutoff for cutoff, _, _ in reversed(GRADE_SCALE[:-1])]
+
+# Score percentiles reported for every course
+PERCENTILES = (10, 25, 50, 75, 90)
+
+# One row per grade; student, course, score and credits are all numeric so they load as float64
+GRADE_ROWS_SQL = text(
+    "SELECT g.student_id, g.course_id, g.score, coalesce(c.credits, 0) "
+    "FROM grades g JOIN courses c ON c.id = g.course_id "
+    "WHERE g.student_id IS NOT NULL"
+)
+
+FETCH_SIZE = 100000
+
+
+def numpy_available():
+    """Imports NumPy if it's installed; the array functions below need this to have returned True"""
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            return False
+        np = numpy
+    return True
+
+
+def resolve_engine(engine=None):
+    """'numpy' or 'python' for a requested engine (default: the configured one), falling back to python without NumPy"""
+    engine = engine or ANALYTICS_ENGINE
+    engine = RENAMED_ENGINES.get(engine, engine)
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown analytics engine {engine!r} (choose from {', '.join(ENGINES)})")
+    if engine == 'numpy' and not numpy_available():
+        print("NumPy is not installed; using the Python engine.")
+        return 'python'
+    return engine
+
+
+class GradeArrays:
+    """Every grade as parallel arrays: student_ids, course_ids, scores and credits"""
+
+    def __init__(self, student_ids, course_ids, scores, credits):
+        self.student_ids = student_ids
+        self.course_ids = course_ids
+        self.scores = scores
+        self.credits = credits
+
+    def __len__(self):
+        return len(self.scores)
+
+
+def load_grades(fetch_size=FETCH_SIZE):
+    """Loads the grades table into a GradeArrays in one pass over a raw DB-API cursor
+
+    The cursor comes from the connection rows.py would read on, so it sees the snapshot too.
+    """
+    cursor = connection_for(GRADE_ROWS_SQL).connection.cursor()
+    try:
+        cursor.execute(GRADE_ROWS_SQL.text)
+        chunks = []
+        while True:
+            rows = cursor.fetchmany(fetch_size)
+            if not rows:
+                break
+            chunks.append(np.array(rows, dtype=np.float64))
+    finally:
+        cursor.close()
+    table = np.concatenate(chunks) if chunks else np.empty((0, 4))
+    return GradeArrays(
+        np.ascontiguousarray(table[:, 0], dtype=np.int64),
+        np.ascontiguousarray(table[:, 1], dtype=np.int64),
+        np.ascontiguousarray(table[:, 2]),
+        np.ascontiguousarray(table[:, 3]),
+    )
+
+
+def letter_buckets(scores):
+    """Bucket index into LETTERS/POINTS for every score"""
+    return np.searchsorted(CUTOFFS, scores, side='right')
+
+
+def percentile_ranks(values):
+    """Percent of values at or below each value (0-100)"""
+    ordered = np.sort(values)
+    return np.searchsorted(ordered, values, side='right') * 100.0 / max(len(values), 1)
+
+
+def student_gpas(grades):
+    """(student ids, GPAs, GPA percentile ranks) for every student with at least one grade"""
+    ids, index = np.unique(grades.student_ids, return_inverse=True)
+    points = np.asarray(POINTS)[letter_buckets(grades.scores)]
+    quality_points = np.bincount(index, weights=points * grades.credits, minlength=len(ids))
+    credits = np.bincount(index, weights=grades.credits, minlength=len(ids))
+    gpas = np.divide(quality_points, credits, out=np.zeros_like(quality_points), where=credits > 0)
+    return ids, gpas, percentile_ranks(gpas)
+
+
+def segment_percentiles(sorted_values, starts, counts, percent):
+    """Linearly interpolated percentile of each [start, start + count) run of sorted_values"""
+    position = starts + (counts - 1) * (percent / 100.0)
+    lower = np.floor(position).astype(np.int64)
+    upper = np.minimum(lower + 1, starts + counts - 1)
+    fraction = position - lower
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * fraction
+
+
+def course_distributions(grades):
+    """(course ids, letter counts [courses × letters], mean scores, {percent: scores}) for every graded course"""
+    ids, index = np.unique(grades.course_ids, return_inverse=True)
+    buckets = letter_buckets(grades.scores)
+    counts = np.bincount(index * len(LETTERS) + buckets, minlength=len(ids) * len(LETTERS)).reshape(len(ids), len(LETTERS))
+    totals = counts.sum(axis=1)
+    means = np.bincount(index, weights=grades.scores, minlength=len(ids)) / totals
+
+    # Sort by course, then score, so each course's scores are one sorted run
+    order = np.lexsort((grades.scores, index))
+    sorted_scores = grades.scores[order]
+    starts = np.concatenate(([0], np.cumsum(totals)[:-1]))
+    percentiles = {p: segment_percentiles(sorted_scores, starts, totals, p) for p in PERCENTILES}
+    return ids, counts, means, percentiles
+
+
+# Row-at-a-time versions with the same output, used by the "python" engine
+def interpolated_percentile(sorted_values, percent):
+    """Same interpolation as segment_percentiles for one sorted list"""
+    position = (len(sorted_values) - 1) * (percent / 100.0)
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def iter_course_distributions_python():
+    """Yields (course id, letter counts, mean score, {percent: score}) one course at a time, in course id order"""
+    rows = iter_rows(
+        select(Grade.course_id, Grade.score)
+        .where(Grade.student_id.is_not(None))
+        .order_by(Grade.course_id, Grade.score),
+        batch_size=10000,
+    )
+    course_id, scores = None, []
+    for row_course_id, score in rows:
+        if row_course_id != course_id and scores:
+            yield _course_summary(course_id, scores)
+            scores = []
+        course_id = row_course_id
+        scores.append(score)
+    if scores:
+        yield _course_summary(course_id, scores)
+
+
+def _course_summary(course_id, sorted_scores):
+    counts = [0] * len(LETTERS)
+    for score in sorted_scores:
+        counts[sum(score >= cutoff for cutoff in CUTOFFS)] += 1
+    mean = sum(sorted_scores) / len(sorted_scores)
+    return course_id, counts, mean, {p: interpolated_percentile(sorted_scores, p) for p in PERCENTILES}
+
+
+# Report rows for the CLI
+def course_distribution_rows(engine=None):
+    """(code, name, letter counts, mean, {percent: score}) for every graded course, ordered by code"""
+    names = {course_id: (code, name) for course_id, code, name in iter_rows(select(Course.id, Course.code, Course.name))}
+    if resolve_engine(engine) == 'numpy':
+        ids, counts, means, percentiles = course_distributions(load_grades())
+        summaries = (
+            (int(course_id), counts[i].tolist(), float(means[i]), {p: float(values[i]) for p, values in percentiles.items()})
+            for i, course_id in enumerate(ids)
+        )
+    else:
+        summaries = iter_course_distributions_python()
+    rows = [(*names[course_id], counts, mean, percentiles) for course_id, counts, mean, percentiles in summaries]
+    return sorted(rows, key=lambda row: row[0])
+
+
+def iter_live_gpas(engine=None):
+    """Streams (student id, first name, last name, GPA, percentile rank) for every student, computed from grades
+
+    Ranks are among students with grades; students without any get GPA 0.0 and rank None.
+    """
+    if resolve_engine(engine) == 'numpy':
+        ids, gpas, ranks = student_gpas(load_grades())
+        by_id = {int(i): (float(g), float(r)) for i, g, r in zip(ids, gpas, ranks)}
+    else:
+        by_id = _live_gpas_python()
+    students = iter_rows(select(Student.id, Student.first_name, Student.last_name).order_by(Student.id))
+    for student_id, first_name, last_name in students:
+        gpa, rank = by_id.get(student_id, (0.0, None))
+        yield student_id, first_name, last_name, gpa, rank
+
+
+def _live_gpas_python():
+    """{student id: (GPA, percentile rank)} for graded students, one grade at a time"""
+    totals = {}
+    rows = iter_rows(
+        select(Grade.student_id, Grade.score, func.coalesce(Course.credits, 0))
+        .join(Course, Course.id == Grade.course_id)
+        .where(Grade.student_id.is_not(None)),
+        batch_size=10000,
+    )
+    for student_id, score, credits in rows:
+        quality_points, total_credits = totals.get(student_id, (0.0, 0))
+        totals[student_id] = (quality_points + score_points(score) * credits, total_credits + credits)
+    gpas = {student_id: gpa_from_totals(*pair) for student_id, pair in totals.items()}
+    ordered = sorted(gpas.values())
+    return {
+        student_id: (gpa, bisect_right(ordered, gpa) * 100.0 / len(ordered))
+        for student_id, gpa in gpas.items()
+    }
+
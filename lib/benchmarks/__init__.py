@@ -0,0 +1,4 @@
+# lib/benchmarks/__init__.py
+#
+# Performance benchmarks for the report and write paths.
+# Run from lib/:  python -m benchmarks --help
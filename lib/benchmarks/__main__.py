@@ -0,0 +1,105 @@
+# lib/benchmarks/__main__.py
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from .scales import LIB_DIR, SCALES, DEFAULT_DATA_DIR, build_database
+from settings import PROFILES
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+# A run regresses when p50 latency exceeds the baseline by this factor (query counts must not grow)
+DEFAULT_THRESHOLD = 1.5
+
+
+def run_scale(scale, data_dir, only=None, profile=None):
+    """Benchmarks one scale in a scratch copy of its fixed database; returns {operation: metrics}"""
+    source = build_database(scale, data_dir)
+    with tempfile.TemporaryDirectory() as workdir:
+        shutil.copy(source, os.path.join(workdir, 'grades.db'))
+        output = os.path.join(workdir, 'results.json')
+        command = [sys.executable, '-m', 'benchmarks.workload', '--output', output]
+        if only:
+            command += ['--only', *only]
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [LIB_DIR, os.environ.get('PYTHONPATH')])),
+                   GRADES_DATABASE_URL=f"sqlite:///{os.path.join(workdir, 'grades.db')}")
+        if profile:
+            env['GRADES_DB_PROFILE'] = profile
+        subprocess.run(command, cwd=workdir, env=env, check=True)
+        with open(output) as f:
+            return json.load(f)
+
+
+def compare(results, baseline, threshold):
+    """Lists human-readable regressions of results against a baseline"""
+    regressions = []
+    for scale, operations in results.items():
+        for name, metrics in operations.items():
+            previous = baseline.get(scale, {}).get(name)
+            if not previous:
+                continue
+            if metrics['p50_ms'] > previous['p50_ms'] * threshold:
+                regressions.append(f"{scale} {name}: p50 {metrics['p50_ms']:.2f}ms vs baseline {previous['p50_ms']:.2f}ms")
+            if metrics['queries'] > previous['queries'] + 0.5:
+                regressions.append(f"{scale} {name}: {metrics['queries']:.1f} queries vs baseline {previous['queries']:.1f}")
+    return regressions
+
+
+def print_results(results):
+    """Prints one table per scale"""
+    for scale, operations in results.items():
+        print(f"\n=== {scale} grades ===")
+        print("Operation".ljust(28) + "p50 ms".rjust(10) + "p95 ms".rjust(10) + "p99 ms".rjust(10)
+              + "queries".rjust(10) + "peak KiB".rjust(11))
+        print("-" * 79)
+        for name, m in operations.items():
+            print(name.ljust(28) + f"{m['p50_ms']:10.2f}{m['p95_ms']:10.2f}{m['p99_ms']:10.2f}"
+                  f"{m['queries']:10.1f}{m['peak_kib']:11.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Benchmark reports and write paths")
+    parser.add_argument('--scales', nargs='*', default=['1k', '100k'], choices=sorted(SCALES),
+                        help="database sizes to run (1m takes a while to build the first time)")
+    parser.add_argument('--only', nargs='*', help="operation names to run (default: all)")
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR, help="where the fixed databases are cached")
+    parser.add_argument('--profile', choices=sorted(PROFILES), help="SQLite connection profile (default: configured one)")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="baseline JSON to compare against")
+    parser.add_argument('--save', action='store_true', help="write the results as the new baseline")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help="allowed p50 slowdown factor")
+    args = parser.parse_args()
+
+    results = {scale: run_scale(scale, args.data_dir, args.only, args.profile) for scale in args.scales}
+    print_results(results)
+
+    if args.save:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        baseline.update(results)
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=2)
+        print(f"\nBaseline saved to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print("\nNo baseline yet; run with --save to record one.")
+        return
+
+    with open(args.baseline) as f:
+        regressions = compare(results, json.load(f), args.threshold)
+    if regressions:
+        print("\nREGRESSIONS:")
+        for line in regressions:
+            print(f"• {line}")
+        sys.exit(1)
+    print("\nNo regressions against the baseline.")
+
+
+if __name__ == "__main__":
+    main()
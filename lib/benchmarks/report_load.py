@@ -0,0 +1,141 @@
+# lib/benchmarks/report_load.py
+#
+# Load test for report_server.py: many concurrent keep-alive clients issue a random mix of
+# report requests for a fixed time, then requests per second and latency percentiles are printed.
+#
+#   python lib/report_server.py --processes 4 &
+#   cd lib && python -m benchmarks.report_load --clients 64 --duration 10
+
+import argparse
+import asyncio
+import json
+import random
+import sqlite3
+import time
+from settings import DATABASE_URL, sqlite_path
+from .workload import percentile
+
+# Relative weights of each request kind in the mix
+MIX = [
+    ('student_gpa', 5),
+    ('student_report', 3),
+    ('course_grades', 1),
+    ('all_gpas', 1),
+]
+
+
+def sample_keys(database):
+    """Student IDs and course codes to build request paths from (read straight from the database)"""
+    connection = sqlite3.connect(f"file:{database}?mode=ro", uri=True)
+    try:
+        student_ids = [row[0] for row in connection.execute("SELECT id FROM students ORDER BY random() LIMIT 10000")]
+        codes = [row[0] for row in connection.execute("SELECT code FROM courses")]
+    finally:
+        connection.close()
+    return student_ids, codes
+
+
+def request_path(kind, rng, student_ids, codes):
+    if kind == 'student_gpa':
+        return f"/students/{rng.choice(student_ids)}/gpa"
+    if kind == 'student_report':
+        return f"/students/{rng.choice(student_ids)}/report"
+    if kind == 'course_grades':
+        return f"/courses/{rng.choice(codes)}/grades?limit=50"
+    return f"/gpa?after={rng.choice(student_ids)}&limit=50"
+
+
+async def fetch(reader, writer, host, path):
+    """One GET on an open keep-alive connection; returns (status, body bytes)"""
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode())
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.lower() == 'content-length':
+            length = int(value)
+    return status, await reader.readexactly(length)
+
+
+async def client(host, port, deadline, rng, keys, results):
+    """Sends requests back to back on one connection until the deadline"""
+    kinds = [kind for kind, _ in MIX]
+    weights = [weight for _, weight in MIX]
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while time.perf_counter() < deadline:
+            kind = rng.choices(kinds, weights)[0]
+            started = time.perf_counter()
+            status, _ = await fetch(reader, writer, host, request_path(kind, rng, *keys))
+            results.append((kind, status, time.perf_counter() - started))
+    finally:
+        writer.close()
+
+
+async def run_load(host, port, clients, duration, keys, seed):
+    results = []
+    deadline = time.perf_counter() + duration
+    rng = random.Random(seed)
+    await asyncio.gather(*[
+        client(host, port, deadline, random.Random(rng.random()), keys, results) for _ in range(clients)
+    ])
+    return results
+
+
+def summarize(results, duration):
+    """Throughput and latency percentiles, overall and per request kind"""
+    def stats(latencies):
+        latencies = sorted(latencies)
+        return {
+            'requests': len(latencies),
+            'rps': len(latencies) / duration,
+            'p50_ms': percentile(latencies, 0.50) * 1000,
+            'p95_ms': percentile(latencies, 0.95) * 1000,
+            'p99_ms': percentile(latencies, 0.99) * 1000,
+            'max_ms': latencies[-1] * 1000,
+        }
+
+    summary = {'all': stats([latency for _, _, latency in results])}
+    for kind, _ in MIX:
+        latencies = [latency for k, _, latency in results if k == kind]
+        if latencies:
+            summary[kind] = stats(latencies)
+    summary['errors'] = sum(1 for _, status, _ in results if status != 200)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.report_load", description="Load test the report server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--clients', type=int, default=32, help="concurrent connections")
+    parser.add_argument('--duration', type=float, default=10.0, help="seconds")
+    parser.add_argument('--database', default=sqlite_path(DATABASE_URL), help="database to pick IDs and codes from")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help="also write the summary to this file")
+    args = parser.parse_args()
+
+    keys = sample_keys(args.database)
+    results = asyncio.run(run_load(args.host, args.port, args.clients, args.duration, keys, args.seed))
+    summary = summarize(results, args.duration)
+
+    print(f"{args.clients} clients for {args.duration:.0f}s, {summary['errors']} error(s)")
+    print("Request".ljust(16) + "requests".rjust(10) + "req/s".rjust(10) + "p50 ms".rjust(9)
+          + "p95 ms".rjust(9) + "p99 ms".rjust(9) + "max ms".rjust(9))
+    print("-" * 72)
+    for kind, m in summary.items():
+        if kind == 'errors':
+            continue
+        print(kind.ljust(16) + f"{m['requests']:10}{m['rps']:10.0f}{m['p50_ms']:9.2f}"
+              f"{m['p95_ms']:9.2f}{m['p99_ms']:9.2f}{m['max_ms']:9.2f}")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# lib/benchmarks/rows.py
+#
+# Compares the cost of reading report rows three ways: ORM entities (what the reports used
+# to load), ORM column selects through Session.execute, and the rows.py read layer. Each
+# workload reads the same columns every way; the time and peak traced memory per row are
+# printed. Runs against the configured database (grades.db in the current directory).
+
+import argparse
+import gc
+import time
+import tracemalloc
+from sqlalchemy import select
+from models import session, Student, Course, Grade
+from rows import fetch_all
+
+DEFAULT_LIMIT = 100000
+
+
+def workloads(limit):
+    """(name, entity statement, entity row -> column tuple, column statement) for each report shape"""
+    return [
+        (
+            'student listing',
+            select(Student).order_by(Student.id).limit(limit),
+            lambda row: (row[0].id, row[0].first_name, row[0].last_name, row[0].email, row[0].enrollment_date),
+            select(Student.id, Student.first_name, Student.last_name, Student.email, Student.enrollment_date)
+            .order_by(Student.id).limit(limit),
+        ),
+        (
+            'course grades',
+            select(Grade, Student).join(Student, Student.id == Grade.student_id).order_by(Grade.id).limit(limit),
+            lambda row: (row[0].id, row[1].first_name, row[1].last_name, row[0].score, row[0].assignment_name),
+            select(Grade.id, Student.first_name, Student.last_name, Grade.score, Grade.assignment_name)
+            .join(Student, Student.id == Grade.student_id).order_by(Grade.id).limit(limit),
+        ),
+        (
+            'student grades',
+            select(Course, Grade).join(Grade, Grade.course_id == Course.id).order_by(Grade.id).limit(limit),
+            lambda row: (row[0].code, row[0].name, row[1].score),
+            select(Course.code, Course.name, Grade.score)
+            .join(Grade, Grade.course_id == Course.id).order_by(Grade.id).limit(limit),
+        ),
+    ]
+
+
+def read_paths(entity_statement, extract, column_statement):
+    """{path name: function returning the rows} for one workload"""
+    def orm_entities():
+        rows = [extract(row) for row in session.execute(entity_statement)]
+        session.expunge_all()
+        return rows
+
+    return {
+        'orm entities': orm_entities,
+        'orm columns': lambda: session.execute(column_statement).all(),
+        'rows': lambda: fetch_all(column_statement),
+    }
+
+
+def measure(read, runs):
+    """(rows, best seconds, peak traced bytes) for one read path"""
+    count = len(read())  # warm up statement caches and the page cache
+    timings = []
+    for _ in range(runs):
+        gc.collect()
+        started = time.perf_counter()
+        read()
+        timings.append(time.perf_counter() - started)
+        session.expunge_all()
+
+    gc.collect()
+    tracemalloc.start()
+    rows = read()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del rows
+    return count, min(timings), peak
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.rows",
+                                     description="Compare ORM and read-layer cost per report row")
+    parser.add_argument('--limit', type=int, default=DEFAULT_LIMIT, help="rows read per workload")
+    parser.add_argument('--runs', type=int, default=3, help="timed runs per path (the best is shown)")
+    args = parser.parse_args()
+
+    print(f"{'workload':17}{'path':14}{'rows':>8}{'µs/row':>9}{'bytes/row':>11}{'vs ORM':>9}")
+    for name, entity_statement, extract, column_statement in workloads(args.limit):
+        baseline = None
+        for path, read in read_paths(entity_statement, extract, column_statement).items():
+            count, seconds, peak = measure(read, args.runs)
+            per_row = seconds * 1e6 / max(count, 1)
+            baseline = baseline or per_row
+            print(f"{name:17}{path:14}{count:8}{per_row:9.2f}{peak / max(count, 1):11.0f}{baseline / per_row:8.1f}x")
+        session.rollback()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+# lib/benchmarks/scales.py
+
+import os
+import subprocess
+import sys
+import tempfile
+
+LIB_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Seed arguments for each fixed synthetic database (about 4 enrollments per student)
+SCALES = {
+    '1k': {'students': 125, 'courses': 20, 'grades_per_enrollment': 2},
+    '100k': {'students': 12500, 'courses': 100, 'grades_per_enrollment': 2},
+    '1m': {'students': 125000, 'courses': 400, 'grades_per_enrollment': 2},
+}
+
+# Every database is generated from the same seed so runs are comparable
+SEED = 42
+
+DEFAULT_DATA_DIR = os.path.join(tempfile.gettempdir(), 'grade-tracker-benchmarks')
+
+
+def database_path(scale, data_dir=DEFAULT_DATA_DIR):
+    """Where the fixed database for a scale is kept"""
+    return os.path.join(data_dir, scale, 'grades.db')
+
+
+def build_database(scale, data_dir=DEFAULT_DATA_DIR, rebuild=False):
+    """Generates the fixed database for a scale with seed.py (once); returns its path"""
+    path = database_path(scale, data_dir)
+    if os.path.exists(path) and not rebuild:
+        return path
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if os.path.exists(path):
+        os.remove(path)
+    params = SCALES[scale]
+    # Generated data can always be rebuilt, so seed without fsyncs
+    env = dict(os.environ, GRADES_DATABASE_URL=f"sqlite:///{path}", GRADES_DB_PROFILE='bulk')
+    subprocess.run([
+        sys.executable, os.path.join(LIB_DIR, 'seed.py'),
+        '--students', str(params['students']),
+        '--courses', str(params['courses']),
+        '--grades-per-enrollment', str(params['grades_per_enrollment']),
+        '--seed', str(SEED),
+    ], cwd=os.path.dirname(path), env=env, check=True, stdout=subprocess.DEVNULL)
+    return path
@@ -0,0 +1,72 @@
+# lib/benchmarks/startup.py
+#
+# Checks how long a one-shot command takes to start. Times `cli.py gpa --student` as a
+# fresh process and uses `python -X importtime` to show which imports the time goes to.
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from .scales import LIB_DIR, DEFAULT_DATA_DIR, build_database
+
+# Wall-clock budget (ms) for the median run of the command; it includes importing SQLAlchemy
+# (about 300 ms of the roughly 650 ms measured here), so it catches heavy imports creeping back in
+DEFAULT_BUDGET_MS = 1000
+
+DEFAULT_COMMAND = ['gpa', '--student', '1']
+
+
+def time_command(command, cwd, runs):
+    """Wall-clock milliseconds of each run of cli.py <command> in a fresh interpreter"""
+    cli = os.path.join(LIB_DIR, 'cli.py')
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, cli, *command], cwd=cwd, check=True, stdout=subprocess.DEVNULL)
+        timings.append((time.perf_counter() - started) * 1000)
+    return sorted(timings)
+
+
+def import_times(command, cwd):
+    """(cumulative µs, module) for every import cli.py <command> makes, slowest first"""
+    cli = os.path.join(LIB_DIR, 'cli.py')
+    result = subprocess.run([sys.executable, '-X', 'importtime', cli, *command], cwd=cwd,
+                            check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, module = line[len('import time:'):].split('|')
+        imports.append((int(cumulative), module.rstrip()))
+    return sorted(imports, reverse=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.startup", description="Check one-shot command startup time")
+    parser.add_argument('--budget', type=float, default=DEFAULT_BUDGET_MS, help="allowed median wall time in ms")
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--top', type=int, default=10, help="slowest imports to list")
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR, help="where the fixed databases are cached")
+    parser.add_argument('command', nargs='*', default=DEFAULT_COMMAND, help="cli.py arguments to time")
+    args = parser.parse_args()
+
+    # Run against the small fixed database so the query itself is negligible
+    cwd = os.path.dirname(build_database('1k', args.data_dir))
+    timings = time_command(args.command, cwd, args.runs)
+    imports = import_times(args.command, cwd)
+    median = timings[len(timings) // 2]
+
+    print(f"cli.py {' '.join(args.command)}: median {median:.1f}ms, min {timings[0]:.1f}ms, max {timings[-1]:.1f}ms")
+    print("\nSlowest imports (cumulative ms):")
+    for microseconds, module in imports[:args.top]:
+        print(f"{microseconds / 1000:8.1f}  {module}")
+
+    if median > args.budget:
+        print(f"\nOver budget: {median:.1f}ms > {args.budget:.0f}ms")
+        sys.exit(1)
+    print(f"\nWithin the {args.budget:.0f}ms budget.")
+
+
+if __name__ == "__main__":
+    main()
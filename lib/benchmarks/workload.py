@@ -0,0 +1,161 @@
+# lib/benchmarks/workload.py
+#
+# Times each helper against the grades.db in the current directory and writes the
+# results as JSON. Run by benchmarks/__main__.py in a scratch copy of a fixed database.
+
+import argparse
+import builtins
+import contextlib
+import json
+import os
+import random
+import time
+import tracemalloc
+from sqlalchemy import event, select
+from models import get_engine, session, Student, Course, enrollments
+import helpers
+import debug
+import report_cache
+
+# Operations timed with the report cache already holding their result; every other operation
+# starts each run with an empty cache so it measures the queries
+WARM_CACHE = {'student_performance_report_cached', 'all_students_gpa_cached'}
+
+# Words used for search_student (first names, last names and email fragments)
+SEARCH_TERMS = ["smith", "john", "garcia", "emma", "university", "mar", "wilson", "taylor"]
+
+_query_count = [0]
+
+
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    _query_count[0] += 1
+
+
+def scripted_input(answers):
+    """input() replacement answering prompts by prefix; anything else (e.g. paging) gets 'q'"""
+    def fake_input(prompt=""):
+        for prefix, value in answers.items():
+            if prompt.startswith(prefix):
+                return value
+        return "q"
+    return fake_input
+
+
+def operations():
+    """(name, timed runs, setup) for every benchmarked path; setup(rng) returns (callable, input answers)"""
+    student_ids = session.scalars(select(Student.id)).all()
+    codes = session.scalars(select(Course.code)).all()
+    enrolled = session.execute(
+        select(enrollments.c.student_id, Course.code)
+        .join(Course, Course.id == enrollments.c.course_id)
+        .limit(10000)
+    ).all()
+
+    def student_answers(rng):
+        return {"Enter student ID": str(rng.choice(student_ids))}
+
+    def enrolled_answers(rng):
+        student_id, code = rng.choice(enrolled)
+        return {
+            "Enter student ID": str(student_id),
+            "Enter course code": code,
+            "Enter score": f"{rng.uniform(50, 100):.1f}",
+            "Assignment name": "Benchmark",
+        }
+
+    return [
+        ("calculate_gpa", 200, lambda rng: (lambda: helpers.calculate_gpa(rng.choice(student_ids)), {})),
+        ("specific_student_gpa", 200, lambda rng: (helpers.specific_student_gpa, student_answers(rng))),
+        ("student_performance_report", 100, lambda rng: (helpers.student_performance_report, student_answers(rng))),
+        ("all_students_gpa", 3, lambda rng: (helpers.all_students_gpa, {})),
+        ("student_performance_report_cached", 100,
+         lambda rng: (helpers.student_performance_report, {"Enter student ID": str(student_ids[0])})),
+        ("all_students_gpa_cached", 20, lambda rng: (helpers.all_students_gpa, {})),
+        ("course_grade_report", 50, lambda rng: (helpers.course_grade_report, {"Enter course code": rng.choice(codes)})),
+        ("search_student", 100, lambda rng: (helpers.search_student, {"Enter student name": rng.choice(SEARCH_TERMS)})),
+        ("enroll_student", 50, lambda rng: (helpers.enroll_student, {
+            "Enter student ID": str(rng.choice(student_ids)), "Enter course code": rng.choice(codes)})),
+        ("record_grades", 50, lambda rng: (helpers.record_grades, enrolled_answers(rng))),
+        ("debug_student_grades", 50, lambda rng: (lambda: debug.debug_student_grades(rng.choice(student_ids)), {})),
+        ("debug_all_students", 2, lambda rng: (debug.debug_all_students, {})),
+        ("debug_all_grades", 2, lambda rng: (debug.debug_all_grades, {})),
+    ]
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def run_operation(setup, runs, rng, devnull, warm_cache=False):
+    """Runs one path once under tracemalloc (peak memory, warm-up) and then `runs` timed times
+
+    Unless warm_cache is set, the report cache is emptied before every run so cached reports
+    are timed doing their queries.
+    """
+    real_input = builtins.input
+    try:
+        func, answers = setup(rng)
+        builtins.input = scripted_input(answers)
+        report_cache.changed_everything()
+        tracemalloc.start()
+        with contextlib.redirect_stdout(devnull):
+            func()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        latencies = []
+        queries = 0
+        for _ in range(runs):
+            func, answers = setup(rng)
+            builtins.input = scripted_input(answers)
+            if not warm_cache:
+                report_cache.changed_everything()
+            before = _query_count[0]
+            started = time.perf_counter()
+            with contextlib.redirect_stdout(devnull):
+                func()
+            latencies.append(time.perf_counter() - started)
+            queries += _query_count[0] - before
+    finally:
+        builtins.input = real_input
+        session.rollback()
+
+    latencies.sort()
+    return {
+        'runs': runs,
+        'mean_ms': sum(latencies) / runs * 1000,
+        'p50_ms': percentile(latencies, 0.50) * 1000,
+        'p95_ms': percentile(latencies, 0.95) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'queries': queries / runs,
+        'peak_kib': peak / 1024,
+    }
+
+
+def run_workload(only=None, seed=0):
+    """Benchmarks every operation (or those named in `only`); returns {name: metrics}"""
+    event.listen(get_engine(), 'before_cursor_execute', _count_query)
+    rng = random.Random(seed)
+    results = {}
+    with open(os.devnull, 'w') as devnull:
+        for name, runs, setup in operations():
+            if only and name not in only:
+                continue
+            results[name] = run_operation(setup, runs, rng, devnull, name in WARM_CACHE)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark helpers against ./grades.db")
+    parser.add_argument('--output', required=True, help="JSON file for the results")
+    parser.add_argument('--only', nargs='*', help="operation names to run")
+    args = parser.parse_args()
+
+    with open(args.output, 'w') as f:
+        json.dump(run_workload(args.only), f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,28 +1,42 @@
 # lib/cli.py
 
-from helpers import *
+import sys
 
 
 def main():
     """Main application loop"""
+    # Before the helpers import, so everything they set up uses the snapshot's engine
+    from settings import SNAPSHOT
+    if SNAPSHOT:
+        from snapshot import enable
+        enable()
+
+    # Imported here so scripted commands don't pay for SQLAlchemy unless they need it
+    from helpers import (exit_program, manage_students, manage_courses, record_grades,
+                         view_reports, calculate_gpas)
+    from instrumentation import action
+
     while True:
         display_main_menu()
         choice = input("> ")
 
         if choice == "0":
             exit_program()
-        elif choice == "1":
-            manage_students()
-        elif choice == "2":
-            manage_courses()
-        elif choice == "3":
-            record_grades()
-        elif choice == "4":
-            view_reports()
-        elif choice == "5":
-            calculate_gpas()
-        else:
-            print("Invalid choice")
+
+        # Queries are attributed to the menu path when GRADES_PROFILE is set
+        with action(choice):
+            if choice == "1":
+                manage_students()
+            elif choice == "2":
+                manage_courses()
+            elif choice == "3":
+                record_grades()
+            elif choice == "4":
+                view_reports()
+            elif choice == "5":
+                calculate_gpas()
+            else:
+                print("Invalid choice")
 
 
 def display_main_menu():
@@ -38,4 +52,8 @@ def display_main_menu():
 
 
 if __name__ == "__main__":
+    # Arguments run a scripted command (see commands.py); none opens the menus
+    if len(sys.argv) > 1:
+        from commands import run
+        sys.exit(run(sys.argv[1:]))
     main()
@@ -0,0 +1,301 @@
+# lib/commands.py
+
+import argparse
+import csv
+import shlex
+import sys
+
+
+class CommandParser(argparse.ArgumentParser):
+    """ArgumentParser that raises instead of exiting, so one bad line doesn't end a batch"""
+
+    def error(self, message):
+        raise CommandError(f"{self.prog}: {message}")
+
+
+class CommandError(Exception):
+    pass
+
+
+def build_parser():
+    """Parser for the scripted (non-interactive) interface"""
+    parser = CommandParser(prog="cli.py", description="Student Grade Tracker commands (run without arguments for the menus)")
+    commands = parser.add_subparsers(dest='command', required=True, parser_class=CommandParser)
+
+    gpa = commands.add_parser('gpa', help="show GPAs")
+    target = gpa.add_mutually_exclusive_group(required=True)
+    target.add_argument('--all', action='store_true', help="every student")
+    target.add_argument('--student', help="one student ID")
+    gpa.add_argument('--format', choices=['text', 'csv'], default='text')
+    gpa.add_argument('--engine', choices=['python', 'numpy'],
+                     help="with --all: compute GPAs and percentile ranks from the grades table instead of the cache")
+
+    report = commands.add_parser('report', help="student or course report")
+    report.add_argument('kind', choices=['student', 'course'])
+    report.add_argument('key', help="student ID or course code")
+    report.add_argument('--format', choices=['text', 'csv'], default='text', help="course reports only")
+
+    distribution = commands.add_parser('distribution', help="grade distribution of every course")
+    distribution.add_argument('--engine', choices=['python', 'numpy'], help="analytics engine (default: configured one)")
+    distribution.add_argument('--format', choices=['text', 'csv'], default='text')
+
+    stats = commands.add_parser('course-stats', help="statistics and ranking for a course, or a summary of all courses")
+    stats.add_argument('code', nargs='?', help="course code (omit for the all-courses summary)")
+    stats.add_argument('--format', choices=['text', 'csv'], default='text', help="all-courses summary only")
+
+    standings = commands.add_parser('standings', help="class rank, percentile and dean's list/probation standing")
+    standings.add_argument('--course', help="only students enrolled in this course")
+    standings.add_argument('--year', help="only students who enrolled in this year")
+    standings.add_argument('--top', type=int, help="only the best N students")
+    standings.add_argument('--format', choices=['text', 'csv'], default='text')
+
+    enroll = commands.add_parser('enroll', help="enroll a student in a course")
+    enroll.add_argument('--student', required=True)
+    enroll.add_argument('--course', required=True)
+
+    roster = commands.add_parser('roster', help="bulk-enroll students in a course, or sync its roster to a list")
+    roster.add_argument('--course', required=True)
+    roster.add_argument('students', nargs='*', help="student IDs")
+    roster.add_argument('--file', help="file of student IDs: one per line, or a CSV with a student_id column ('-' for stdin)")
+    roster.add_argument('--sync', action='store_true', help="also drop enrolled students who aren't listed")
+    roster.add_argument('--dry-run', action='store_true', help="only report what would change")
+
+    grade = commands.add_parser('grade', help="record a grade")
+    grade.add_argument('--student', required=True)
+    grade.add_argument('--course', required=True)
+    grade.add_argument('--score', required=True)
+    grade.add_argument('--assignment')
+
+    student = commands.add_parser('add-student', help="add a student")
+    student.add_argument('--first', required=True)
+    student.add_argument('--last', required=True)
+    student.add_argument('--email', required=True)
+
+    course = commands.add_parser('add-course', help="create a course")
+    course.add_argument('--code', required=True)
+    course.add_argument('--name', required=True)
+    course.add_argument('--credits', required=True)
+
+    search = commands.add_parser('search', help="search students by name or email")
+    search.add_argument('query')
+
+    verify = commands.add_parser('verify-gpa', help="check the GPA cache against the grades table")
+    verify.add_argument('--rebuild', action='store_true', help="rebuild the cache if it has drifted")
+
+    batch = commands.add_parser('batch', help="run one command per line from a file ('-' for stdin)")
+    batch.add_argument('path')
+    batch.add_argument('--stop-on-error', action='store_true')
+    return parser
+
+
+def run_gpa(args):
+    if args.student:
+        from helpers import show_student_gpa
+        return show_student_gpa(args.student, args.format)
+    from helpers import all_students_gpa, write_gpa_csv, write_live_gpas
+    from gpa import iter_cached_gpas
+    if args.engine:
+        from analytics import iter_live_gpas
+        if args.format == 'text':
+            write_live_gpas(args.engine)
+            return True
+        writer = csv.writer(sys.stdout)
+        writer.writerow(['student_id', 'student_name', 'gpa', 'percentile'])
+        for student_id, first_name, last_name, gpa, rank in iter_live_gpas(args.engine):
+            writer.writerow([student_id, f"{first_name} {last_name}", f"{gpa:.2f}", "" if rank is None else f"{rank:.1f}"])
+        return True
+    if args.format == 'csv':
+        write_gpa_csv(iter_cached_gpas())
+        return True
+    all_students_gpa()
+    return True
+
+
+def run_report(args):
+    from helpers import show_student_report, write_course_grades
+    if args.kind == 'student':
+        return show_student_report(args.key)
+    return write_course_grades(args.key, args.format)
+
+
+def run_distribution(args):
+    from helpers import write_grade_distribution
+    return write_grade_distribution(args.format, args.engine)
+
+
+def run_course_stats(args):
+    from helpers import write_course_stats, write_courses_summary
+    if args.code:
+        return write_course_stats(args.code)
+    return write_courses_summary(args.format)
+
+
+def run_standings(args):
+    from helpers import resolve_cohort, write_standings
+    cohort = resolve_cohort(args.course, args.year)
+    return cohort is not None and write_standings(*cohort, top=args.top, fmt=args.format)
+
+
+def run_enroll(args):
+    from helpers import enroll
+    return enroll(args.student, args.course)
+
+
+def run_roster(args):
+    from helpers import sync_roster
+    from roster import read_student_ids
+    try:
+        student_ids = [int(student_id) for student_id in args.students]
+    except ValueError:
+        print("Student IDs must be numbers.")
+        return False
+    if args.file:
+        file_ids, rejected = read_student_ids(args.file)
+        for line_number, value in rejected:
+            print(f"{args.file}:{line_number}: not a student ID: {value}")
+        student_ids += file_ids
+    return sync_roster(args.course, student_ids, args.sync, args.dry_run)
+
+
+def run_grade(args):
+    from helpers import find_enrollment, save_grade
+    enrollment = find_enrollment(args.student, args.course)
+    return bool(enrollment) and save_grade(*enrollment, args.score, args.assignment)
+
+
+def run_add_student(args):
+    from helpers import create_student
+    return create_student(args.first.strip(), args.last.strip(), args.email.strip())
+
+
+def run_add_course(args):
+    from helpers import add_course
+    return add_course(args.code, args.name.strip(), args.credits)
+
+
+def run_search(args):
+    from helpers import print_search_results
+    print_search_results(args.query.strip())
+    return True
+
+
+def run_verify_gpa(args):
+    from gpa import find_gpa_drift, rebuild_gpa_cache
+    drift = find_gpa_drift()
+    print(f"{len(drift)} cached GPA(s) out of date.")
+    if drift and args.rebuild:
+        print(f"GPA cache rebuilt for {rebuild_gpa_cache()} students.")
+        return True
+    return not drift
+
+
+def run_batch(args):
+    """Runs every command in a file in this process (one import, one session)"""
+    parser = build_parser()
+    failures = 0
+    f = sys.stdin if args.path == '-' else open(args.path)
+    try:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            try:
+                line_args = parser.parse_args(shlex.split(line))
+                if line_args.command == 'batch':
+                    raise CommandError("batch files can't run other batch files")
+                if line_args.command in QUEUED_COMMANDS:
+                    start_write_batch()
+                else:
+                    # Reads see (and print after the "saved" messages of) every earlier write
+                    flush_write_queue()
+                ok = COMMANDS[line_args.command](line_args)
+            except (CommandError, ValueError) as e:
+                print(e)
+                ok = False
+            except SystemExit as e:
+                # --help prints usage and exits; that's all the line asked for
+                ok = not e.code
+            except Exception as e:
+                if not is_database_error(e):
+                    raise
+                rollback_session()
+                print(f"Database error: {getattr(e, 'orig', None) or e}")
+                ok = False
+            if not ok:
+                failures += 1
+                print(f"Line {line_number} failed: {line}")
+                if args.stop_on_error:
+                    break
+    finally:
+        if f is not sys.stdin:
+            f.close()
+    failures += close_write_queue()
+    if failures:
+        print(f"{failures} command(s) failed.")
+    return not failures
+
+
+def is_database_error(error):
+    """True for an SQLAlchemy error (checked without importing SQLAlchemy if no command has)"""
+    exc = sys.modules.get('sqlalchemy.exc')
+    return exc is not None and isinstance(error, exc.SQLAlchemyError)
+
+
+def rollback_session():
+    """Rolls back the helpers' session after a failed line, so the next line starts clean"""
+    models = sys.modules.get('models')
+    if models:
+        models.session.rollback()
+
+
+def start_write_batch():
+    """Lets queued commands return before their writes commit; their messages still print in order"""
+    import write_queue
+    write_queue.start_batch()
+
+
+def flush_write_queue():
+    """Waits for writes queued by the helpers (GRADES_WRITE_QUEUE) to commit"""
+    write_queue = sys.modules.get('write_queue')
+    if write_queue:
+        write_queue.flush()
+
+
+def close_write_queue():
+    """Commits writes still queued by the helpers (GRADES_WRITE_QUEUE); returns how many failed"""
+    # Only loaded once a helper has run, so read-only commands never import SQLAlchemy for it
+    write_queue = sys.modules.get('write_queue')
+    return write_queue.close() if write_queue else 0
+
+
+# Commands whose writes may wait in the write queue; a batch runs them without waiting for earlier ones
+QUEUED_COMMANDS = {'enroll', 'grade', 'add-student'}
+
+COMMANDS = {
+    'gpa': run_gpa,
+    'report': run_report,
+    'distribution': run_distribution,
+    'course-stats': run_course_stats,
+    'standings': run_standings,
+    'enroll': run_enroll,
+    'roster': run_roster,
+    'grade': run_grade,
+    'add-student': run_add_student,
+    'add-course': run_add_course,
+    'search': run_search,
+    'verify-gpa': run_verify_gpa,
+    'batch': run_batch,
+}
+
+
+def run(argv):
+    """Runs one scripted command; returns the process exit status"""
+    parser = build_parser()
+    try:
+        args = parser.parse_args(argv)
+    except CommandError as e:
+        parser.print_usage(sys.stderr)
+        print(e, file=sys.stderr)
+        return 2
+    ok = COMMANDS[args.command](args)
+    return 0 if ok and not close_write_queue() else 1
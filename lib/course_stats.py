@@ -0,0 +1,108 @@
+# lib/course_stats.py
+#
+# Per-course statistics computed by SQLite: count, mean, median, standard deviation, min/max and
+# the letter-grade histogram come from one aggregate over a window query (for one course or every
+# course at once), and per-student ranks come from window functions over each student's average.
+
+import math
+from sqlalchemy import case, func, select
+from models import Student, Course, Grade
+from gpa import GRADE_SCALE, letter_grade
+from rows import fetch_first, iter_rows
+from standings import percentile_of_rank
+
+
+def course_stats_statement(course_id=None):
+    """(course id, code, name, count, mean, median, mean of squares, min, max, one count per letter) per graded course
+
+    The inner query numbers each course's grades by score (row_number/count windows over the
+    ix_grades_course_score index), so the median falls out of the same single aggregation pass.
+    """
+    positioned = select(
+        Grade.course_id,
+        Grade.score,
+        func.row_number().over(partition_by=Grade.course_id, order_by=Grade.score).label('position'),
+        # Same partition and order as position (whole-partition frame), so one sorted pass serves both
+        func.count().over(partition_by=Grade.course_id, order_by=Grade.score, rows=(None, None)).label('total'),
+    )
+    if course_id is not None:
+        positioned = positioned.where(Grade.course_id == course_id)
+    positioned = positioned.subquery()
+
+    score, position, total = positioned.c.score, positioned.c.position, positioned.c.total
+    # Middle row for an odd count, the two middle rows for an even one (// is integer division;
+    # / would be true division and only ever match the upper middle row)
+    middle = position.in_([(total + 1) // 2, (total + 2) // 2])
+    letter = letter_grade(score)
+    stats = (
+        select(
+            positioned.c.course_id,
+            func.count().label('count'),
+            func.avg(score).label('mean'),
+            func.avg(case((middle, score))).label('median'),
+            func.avg(score * score).label('mean_square'),
+            func.min(score).label('min'),
+            func.max(score).label('max'),
+            *[func.sum(case((letter == grade_letter, 1), else_=0)).label(grade_letter)
+              for _, grade_letter, _ in GRADE_SCALE],
+        )
+        .group_by(positioned.c.course_id)
+        .subquery()
+    )
+    # Courses are joined after aggregating, so the join touches one row per course
+    return (
+        select(stats.c.course_id, Course.code, Course.name, *list(stats.c)[1:])
+        .join(Course, Course.id == stats.c.course_id)
+        .order_by(Course.code)
+    )
+
+
+def standard_deviation(row):
+    """Population standard deviation from a stats row (SQLite has no stddev aggregate)"""
+    return math.sqrt(max(row.mean_square - row.mean * row.mean, 0.0))
+
+
+def course_stats(course_id):
+    """Stats row for one course, or None if it has no grades"""
+    return fetch_first(course_stats_statement(course_id))
+
+
+def iter_course_stats():
+    """Stats rows for every graded course, ordered by code, from a single query"""
+    return iter_rows(course_stats_statement())
+
+
+def student_ranks_statement(course_id):
+    """(position, student id, first name, last name, grades, average, rank, percentile) for a course
+
+    Students are ranked by their average score in the course; ties share a rank, and the
+    percentile is the same as the class standings' (the top student is at 100). `position`
+    is unique, so pages can be fetched by keyset on it.
+    """
+    averages = (
+        select(
+            Grade.student_id,
+            func.count().label('grades'),
+            func.avg(Grade.score).label('average'),
+        )
+        .where(Grade.course_id == course_id)
+        .group_by(Grade.student_id)
+        .subquery()
+    )
+    average = averages.c.average
+    rank = func.rank().over(order_by=average.desc())
+    ranked = (
+        select(
+            func.row_number().over(order_by=[average.desc(), averages.c.student_id]).label('position'),
+            Student.id,
+            Student.first_name,
+            Student.last_name,
+            averages.c.grades,
+            average,
+            rank.label('rank'),
+            percentile_of_rank(rank, func.count().over()).label('percentile'),
+        )
+        .join(Student, Student.id == averages.c.student_id)
+        .subquery()
+    )
+    return select(ranked), ranked.c.position
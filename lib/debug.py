@@ -1,58 +1,100 @@
 #!/usr/bin/env python3
 # lib/debug.py
 
-from models import session, Student, Course, Grade
-import ipdb
-
-
-def debug_all_students():
-    """Prints all students with their details"""
-    students = session.query(Student).all()
-    print(f"\n=== ALL STUDENTS ({len(students)}) ===")
-    for student in students:
-        print(f"ID: {student.id} | {student.first_name} {student.last_name} | {student.email}")
-        print(f"  Courses: {[course.code for course in student.courses]}")
-        print(f"  Grades: {len(student.grades)}")
-
-
-def debug_student_grades(student_id):
-    """Shows grades for a specific student"""
-    student = session.query(Student).get(student_id)
+from models import Student, Course, Grade, enrollments
+from sqlalchemy import func, select
+from lookups import cache_stats, course_by_code, student_by_id
+from rows import fetch_scalar, iter_rows
+import report_cache
+
+
+def debug_all_students(limit=None, name=None):
+    """Prints all students with their details (optionally the first `limit` whose name or email contains `name`)"""
+    courses = (
+        select(func.group_concat(Course.code, ','))
+        .join(enrollments, enrollments.c.course_id == Course.id)
+        .where(enrollments.c.student_id == Student.id)
+        .scalar_subquery()
+    )
+    grade_count = select(func.count(Grade.id)).where(Grade.student_id == Student.id).scalar_subquery()
+    statement = select(Student.id, Student.first_name, Student.last_name, Student.email, courses, grade_count)
+    if name:
+        statement = statement.where(
+            Student.first_name.ilike(f'%{name}%') | Student.last_name.ilike(f'%{name}%') | Student.email.ilike(f'%{name}%')
+        )
+
+    total = fetch_scalar(select(func.count()).select_from(statement.subquery()))
+    rows = iter_rows(statement.order_by(Student.id).limit(limit))
+    print(f"\n=== ALL STUDENTS ({total}) ===")
+    for student_id, first_name, last_name, email, codes, grades in rows:
+        print(f"ID: {student_id} | {first_name} {last_name} | {email}")
+        print(f"  Courses: {codes.split(',') if codes else []}")
+        print(f"  Grades: {grades}")
+
+
+def debug_student_grades(student_id, course_code=None, limit=None):
+    """Shows grades for a specific student (optionally for one course)"""
+    student = student_by_id(student_id)
     if not student:
         print("Student not found.")
         return
 
+    statement = (
+        select(Course.code, Grade.score, Grade.assignment_name)
+        .join(Course, Course.id == Grade.course_id)
+        .where(Grade.student_id == student_id)
+    )
+    if course_code:
+        statement = statement.where(Course.code == course_code.upper())
+
     print(f"\n=== GRADES FOR {student.first_name} {student.last_name} ===")
-    for grade in student.grades:
-        print(f"{grade.course.code}: {grade.score:.1f}% ({grade.assignment_name})")
+    for code, score, assignment_name in iter_rows(statement.order_by(Grade.id).limit(limit)):
+        print(f"{code}: {score:.1f}% ({assignment_name})")
 
 
-def debug_course_enrollment(course_code):
+def debug_course_enrollment(course_code, limit=None):
     """Lists all students in a course"""
-    course = session.query(Course).filter_by(code=course_code).first()
+    course = course_by_code(course_code)
     if not course:
         print("Course not found.")
         return
 
+    rows = iter_rows(
+        select(Student.id, Student.first_name, Student.last_name)
+        .join(enrollments, enrollments.c.student_id == Student.id)
+        .where(enrollments.c.course_id == course.id)
+        .order_by(Student.id)
+        .limit(limit)
+    )
     print(f"\n=== ENROLLMENT FOR {course.code}: {course.name} ===")
-    for student in course.students:
-        print(f"ID: {student.id} | {student.first_name} {student.last_name}")
+    for student_id, first_name, last_name in rows:
+        print(f"ID: {student_id} | {first_name} {last_name}")
 
 
-def debug_all_grades():
-    """Shows all grades in the system"""
-    grades = session.query(Grade).all()
-    print(f"\n=== ALL GRADES ({len(grades)}) ===")
-    for grade in grades:
-        student_name = f"{grade.student.first_name} {grade.student.last_name}"
-        print(f"{student_name} - {grade.course.code}: {grade.score:.1f}% ({grade.assignment_name})")
+def debug_all_grades(limit=None, student_id=None, course_code=None):
+    """Shows all grades in the system (optionally the first `limit`, for one student and/or course)"""
+    statement = (
+        select(Student.first_name, Student.last_name, Course.code, Grade.score, Grade.assignment_name)
+        .join(Student, Student.id == Grade.student_id)
+        .join(Course, Course.id == Grade.course_id)
+    )
+    if student_id is not None:
+        statement = statement.where(Grade.student_id == student_id)
+    if course_code:
+        statement = statement.where(Course.code == course_code.upper())
+
+    total = fetch_scalar(select(func.count()).select_from(statement.subquery()))
+    rows = iter_rows(statement.order_by(Grade.id).limit(limit))
+    print(f"\n=== ALL GRADES ({total}) ===")
+    for first_name, last_name, code, score, assignment_name in rows:
+        print(f"{first_name} {last_name} - {code}: {score:.1f}% ({assignment_name})")
 
 
 def debug_database_stats():
     """Shows database statistics"""
-    student_count = session.query(Student).count()
-    course_count = session.query(Course).count()
-    grade_count = session.query(Grade).count()
+    student_count = fetch_scalar(select(func.count()).select_from(Student))
+    course_count = fetch_scalar(select(func.count()).select_from(Course))
+    grade_count = fetch_scalar(select(func.count()).select_from(Grade))
 
     print("\n=== DATABASE STATISTICS ===")
     print(f"Students: {student_count}")
@@ -60,6 +102,29 @@ def debug_database_stats():
     print(f"Grades: {grade_count}")
 
 
+def debug_lookup_cache():
+    """Shows the course/student lookup cache sizes and hit rates"""
+    print("\n=== LOOKUP CACHE ===")
+    for name, (entries, hits, misses) in cache_stats().items():
+        rate = hits * 100.0 / (hits + misses) if hits + misses else 0.0
+        print(f"{name.capitalize()}: {entries} cached | {hits} hits | {misses} misses | {rate:.1f}% hit rate")
+
+
+def debug_report_cache():
+    """Shows the report cache size and hit rate"""
+    entries, size, hits, misses = report_cache.cache_stats()
+    rate = hits * 100.0 / (hits + misses) if hits + misses else 0.0
+    print("\n=== REPORT CACHE ===")
+    print(f"{entries} reports | {size / 2**20:.1f} of {report_cache.REPORT_CACHE_BYTES / 2**20:.0f} MB | "
+          f"{hits} hits | {misses} misses | {rate:.1f}% hit rate")
+
+
 if __name__ == "__main__":
-    print("Debug utilities loaded. Use functions like debug_all_students(), debug_student_grades(1), etc.")
+    import ipdb
+    from settings import SNAPSHOT
+    if SNAPSHOT:
+        # Also available on demand: from snapshot import enable; enable()
+        from snapshot import enable
+        enable()
+    print("Debug utilities loaded. Use functions like debug_all_students(limit=20), debug_student_grades(1), etc.")
     ipdb.set_trace()
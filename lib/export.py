@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+# lib/export.py
+
+import argparse
+import csv
+import gzip
+import json
+import sys
+import time
+from itertools import groupby
+from sqlalchemy import func, select
+from models import Student, Course, Grade, GpaSummary
+from rows import execute, records
+from gpa import academic_standing, letter_grade
+
+# Rows fetched from SQLite per round trip while streaming
+FETCH_SIZE = 5000
+
+# Write buffer for uncompressed output files
+WRITE_BUFFER = 1 << 20
+
+FORMATS = ('csv', 'jsonl')
+
+
+def transcripts_statement():
+    """Every grade of every student (students without grades get one row of NULLs), in student order"""
+    return (
+        select(
+            Student.id.label('student_id'),
+            Student.first_name,
+            Student.last_name,
+            Student.email,
+            GpaSummary.gpa,
+            GpaSummary.standing,
+            Course.code.label('course_code'),
+            Course.name.label('course_name'),
+            Course.credits,
+            Grade.score,
+            letter_grade(Grade.score).label('grade'),
+            Grade.assignment_name,
+            Grade.date_recorded,
+        )
+        .outerjoin(GpaSummary, GpaSummary.student_id == Student.id)
+        .outerjoin(Grade, Grade.student_id == Student.id)
+        .outerjoin(Course, Course.id == Grade.course_id)
+        .order_by(Student.id, Grade.id)
+    )
+
+
+def grade_sheets_statement(course_code=None):
+    """Every grade in every course (or one course), grouped by course code"""
+    statement = (
+        select(
+            Course.code.label('course_code'),
+            Course.name.label('course_name'),
+            Student.id.label('student_id'),
+            Student.first_name,
+            Student.last_name,
+            Grade.score,
+            letter_grade(Grade.score).label('grade'),
+            Grade.assignment_name,
+            Grade.date_recorded,
+        )
+        .join(Grade, Grade.course_id == Course.id)
+        .join(Student, Student.id == Grade.student_id)
+        .order_by(Course.code, Grade.id)
+    )
+    if course_code:
+        statement = statement.where(Course.code == course_code.strip().upper())
+    return statement
+
+
+def gpa_table_statement():
+    """Every student's cached GPA totals and standing (0.0 and probation if they have no grades)"""
+    gpa = func.coalesce(GpaSummary.gpa, 0.0)
+    return (
+        select(
+            Student.id.label('student_id'),
+            Student.first_name,
+            Student.last_name,
+            func.coalesce(GpaSummary.credits, 0).label('credits'),
+            func.coalesce(GpaSummary.quality_points, 0.0).label('quality_points'),
+            gpa.label('gpa'),
+            func.coalesce(GpaSummary.standing, academic_standing(0.0)).label('standing'),
+        )
+        .outerjoin(GpaSummary, GpaSummary.student_id == Student.id)
+        .order_by(Student.id)
+    )
+
+
+EXPORTS = {
+    'transcripts': transcripts_statement,
+    'grade-sheets': grade_sheets_statement,
+    'gpa': gpa_table_statement,
+}
+
+
+def stream_rows(statement, fetch_size=FETCH_SIZE):
+    """(column names, row iterator) for one query, fetched fetch_size rows at a time"""
+    result = execute(statement, batch_size=fetch_size)
+    return list(result.keys()), records(result)
+
+
+def open_output(path, compress=False):
+    """Text file for an export ('-' is stdout); gzip when asked or when the path ends in .gz"""
+    if path == '-':
+        return sys.stdout
+    if compress or path.endswith('.gz'):
+        return gzip.open(path, 'wt', newline='', compresslevel=6)
+    return open(path, 'w', newline='', buffering=WRITE_BUFFER)
+
+
+def write_csv(columns, rows, out):
+    """Writes a header and one CSV line per row; returns the row count"""
+    writer = csv.writer(out)
+    writer.writerow(columns)
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+    return count
+
+
+def write_jsonl(records, out):
+    """Writes one JSON object per line; returns the record count"""
+    encode = json.JSONEncoder(default=str, ensure_ascii=False).encode
+    count = 0
+    for record in records:
+        out.write(encode(record))
+        out.write('\n')
+        count += 1
+    return count
+
+
+def as_records(columns, rows):
+    """Rows as dicts keyed by column name"""
+    for row in rows:
+        yield dict(zip(columns, row))
+
+
+def nest_transcripts(columns, rows):
+    """Groups consecutive transcript rows into one record per student (only one student in memory)"""
+    grade_columns = columns[6:]
+    for student_id, student_rows in groupby(rows, key=lambda row: row[0]):
+        student_rows = list(student_rows)
+        _, first_name, last_name, email, gpa, standing = student_rows[0][:6]
+        yield {
+            'student_id': student_id,
+            'name': f"{first_name} {last_name}",
+            'email': email,
+            'gpa': gpa or 0.0,
+            'standing': standing or academic_standing(0.0),
+            # A student without grades comes back as one row of NULL grade columns
+            'grades': [dict(zip(grade_columns, row[6:])) for row in student_rows if row[6] is not None],
+        }
+
+
+def export(kind, path, fmt='csv', compress=False, course_code=None):
+    """Streams one export to a file in a single query; returns (records written, seconds)"""
+    started = time.perf_counter()
+    statement = grade_sheets_statement(course_code) if kind == 'grade-sheets' else EXPORTS[kind]()
+    columns, rows = stream_rows(statement)
+    out = open_output(path, compress)
+    try:
+        if fmt == 'csv':
+            count = write_csv(columns, rows, out)
+        elif kind == 'transcripts':
+            count = write_jsonl(nest_transcripts(columns, rows), out)
+        else:
+            count = write_jsonl(as_records(columns, rows), out)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return count, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export transcripts, course grade sheets or GPAs to CSV or JSONL")
+    parser.add_argument('kind', choices=sorted(EXPORTS))
+    parser.add_argument('path', help="output file ('-' for stdout; a .gz suffix compresses)")
+    parser.add_argument('--format', choices=FORMATS, help="default: from the file name, else csv")
+    parser.add_argument('--gzip', action='store_true', help="compress even without a .gz suffix")
+    parser.add_argument('--course', help="grade-sheets only: export one course")
+    args = parser.parse_args()
+
+    fmt = args.format or ('jsonl' if '.jsonl' in args.path else 'csv')
+    count, seconds = export(args.kind, args.path, fmt, args.gzip, args.course)
+    if args.path != '-':
+        rate = count / seconds if seconds else 0.0
+        unit = 'students' if args.kind == 'transcripts' and fmt == 'jsonl' else 'rows'
+        print(f"Exported {count:,} {unit} to {args.path} in {seconds:.2f}s ({rate:,.0f} {unit}/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+# lib/gpa.py
+
+from datetime import datetime
+from sqlalchemy import case, delete, func, insert, literal, or_, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from models import session, Student, Course, Grade, GpaSummary
+from rows import fetch_all, fetch_first, fetch_scalar, iter_rows
+
+# Minimum GPA for good standing; anything below is academic probation
+GOOD_STANDING_GPA = 2.0
+
+# Minimum GPA for the dean's list (shown by the class standings report)
+DEANS_LIST_GPA = 3.5
+
+# Letter grade cut-offs and grade points (lowest bucket catches everything else)
+GRADE_SCALE = [
+    (90, 'A', 4.0),
+    (80, 'B', 3.0),
+    (70, 'C', 2.0),
+    (60, 'D', 1.0),
+    (0, 'F', 0.0),
+]
+
+
+def grade_points(score):
+    """SQL expression mapping a 0-100 score column to grade points"""
+    return case(
+        *[(score >= cutoff, points) for cutoff, _, points in GRADE_SCALE[:-1]],
+        else_=GRADE_SCALE[-1][2]
+    )
+
+
+def letter_grade(score):
+    """SQL expression mapping a 0-100 score column to its letter (same scale as format_grade)"""
+    return case(
+        *[(score >= cutoff, letter) for cutoff, letter, _ in GRADE_SCALE[:-1]],
+        else_=GRADE_SCALE[-1][1]
+    )
+
+
+def gpa_totals():
+    """Select of (student id, first name, last name, quality points, credits) for every student"""
+    return (
+        select(
+            Student.id,
+            Student.first_name,
+            Student.last_name,
+            func.coalesce(func.sum(grade_points(Grade.score) * Course.credits), 0.0).label('quality_points'),
+            func.coalesce(func.sum(Course.credits), 0).label('credits'),
+        )
+        .outerjoin(Grade, Grade.student_id == Student.id)
+        .outerjoin(Course, Course.id == Grade.course_id)
+        .group_by(Student.id)
+        .order_by(Student.id)
+    )
+
+
+def score_points(score):
+    """Grade points for a 0-100 score"""
+    for cutoff, _, points in GRADE_SCALE:
+        if score >= cutoff:
+            return points
+    return GRADE_SCALE[-1][2]
+
+
+def gpa_from_totals(quality_points, credits):
+    """Turns quality points and attempted credits into a GPA"""
+    return quality_points / credits if credits else 0.0
+
+
+def academic_standing(gpa):
+    """Standing label for a GPA"""
+    return 'Good Standing' if gpa >= GOOD_STANDING_GPA else 'Academic Probation'
+
+
+def _standing_expr(gpa):
+    """SQL version of academic_standing"""
+    return case((gpa >= GOOD_STANDING_GPA, 'Good Standing'), else_='Academic Probation')
+
+
+def _gpa_expr(quality_points, credits):
+    """SQL version of gpa_from_totals"""
+    return case((credits > 0, quality_points / credits), else_=0.0)
+
+
+# Cached GPA summaries
+def cached_summary(student_id):
+    """Cached (GPA, standing) for a student, or None if no grades are recorded"""
+    return fetch_first(select(GpaSummary.gpa, GpaSummary.standing).where(GpaSummary.student_id == student_id))
+
+
+def cached_gpa(student_id):
+    """Cached GPA for a student (primary key lookup)"""
+    summary = cached_summary(student_id)
+    return summary.gpa if summary else 0.0
+
+
+def iter_cached_gpas(batch_size=1000):
+    """Streams (student id, first name, last name, GPA) for every student from the GPA cache"""
+    rows = iter_rows(
+        select(Student.id, Student.first_name, Student.last_name, func.coalesce(GpaSummary.gpa, 0.0))
+        .outerjoin(GpaSummary, GpaSummary.student_id == Student.id)
+        .order_by(Student.id),
+        batch_size=batch_size,
+    )
+    for row in rows:
+        yield tuple(row)
+
+
+def apply_grade_deltas(deltas):
+    """Adds (student_id, quality_points, credits) deltas to the GPA cache in the current transaction"""
+    now = datetime.now()
+    rows = []
+    for student_id, quality_points, credits in deltas:
+        gpa = gpa_from_totals(quality_points, credits)
+        rows.append({
+            'student_id': student_id,
+            'quality_points': quality_points,
+            'credits': credits,
+            'gpa': gpa,
+            'standing': academic_standing(gpa),
+            'updated_at': now,
+        })
+    if rows:
+        session.execute(_grade_delta_upsert(), rows)
+
+
+_upsert = None
+
+
+def _grade_delta_upsert():
+    """INSERT ... ON CONFLICT DO UPDATE adding one delta row to a summary, built once (it's costly to construct)"""
+    global _upsert
+    if _upsert is None:
+        table = GpaSummary.__table__
+        stmt = sqlite_insert(table)
+        total_points = table.c.quality_points + stmt.excluded.quality_points
+        total_credits = table.c.credits + stmt.excluded.credits
+        gpa = _gpa_expr(total_points, total_credits)
+        _upsert = stmt.on_conflict_do_update(
+            index_elements=[table.c.student_id],
+            set_={
+                'quality_points': total_points,
+                'credits': total_credits,
+                'gpa': gpa,
+                'standing': _standing_expr(gpa),
+                'updated_at': stmt.excluded.updated_at,
+            },
+        )
+    return _upsert
+
+
+def record_grade_points(student_id, credits, score):
+    """Adds one new grade to the GPA cache in the current transaction"""
+    credits = credits or 0
+    apply_grade_deltas([(student_id, score_points(score) * credits, credits)])
+
+
+def _graded_totals():
+    """gpa_totals restricted to students that have at least one grade"""
+    return gpa_totals().having(func.count(Grade.id) > 0).order_by(None)
+
+
+def find_gpa_drift(tolerance=1e-9):
+    """Lists (student id, cached GPA, actual GPA) wherever the cache disagrees with the grades table"""
+    totals = _graded_totals().subquery()
+    actual_gpa = _gpa_expr(totals.c.quality_points, totals.c.credits)
+    stale = fetch_all(
+        select(totals.c.id, GpaSummary.gpa, actual_gpa)
+        .outerjoin(GpaSummary, GpaSummary.student_id == totals.c.id)
+        .where(or_(
+            GpaSummary.student_id.is_(None),
+            func.abs(GpaSummary.quality_points - totals.c.quality_points) > tolerance,
+            GpaSummary.credits != totals.c.credits,
+            func.abs(GpaSummary.gpa - actual_gpa) > tolerance,
+        ))
+    )
+    orphaned = fetch_all(
+        select(GpaSummary.student_id, GpaSummary.gpa, literal(0.0))
+        .where(GpaSummary.student_id.not_in(select(totals.c.id)))
+    )
+    return [tuple(row) for row in stale + orphaned]
+
+
+def rebuild_gpa_cache():
+    """Recomputes every cached GPA from the grades table; returns the number of students cached"""
+    GpaSummary.__table__.create(session.get_bind(), checkfirst=True)
+    totals = _graded_totals().subquery()
+    gpa = _gpa_expr(totals.c.quality_points, totals.c.credits)
+    session.execute(delete(GpaSummary))
+    session.execute(
+        insert(GpaSummary).from_select(
+            ['student_id', 'quality_points', 'credits', 'gpa', 'standing', 'updated_at'],
+            select(totals.c.id, totals.c.quality_points, totals.c.credits, gpa, _standing_expr(gpa), literal(datetime.now())),
+        )
+    )
+    session.commit()
+    return fetch_scalar(select(func.count()).select_from(GpaSummary))
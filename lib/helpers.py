@@ -1,17 +1,74 @@
 # lib/helpers.py
 
+import csv
+import itertools
 import os
-from models import session, Student, Course, Grade
+import sys
+from datetime import datetime
+from models import session, Student, Course, Grade, enrollments
+from sqlalchemy import insert, select
 from sqlalchemy.exc import IntegrityError
+from pagination import browse
+from rows import fetch_all, iter_rows
+from instrumentation import tracked
+from search import search_students, SEARCH_LIMIT
+from lookups import course_by_code, student_by_id, forget_course, forget_student, is_enrolled
+from roster import apply_roster, parse_student_ids, plan_roster, read_student_ids
+import write_queue
+import report_cache
+from analytics import LETTERS, PERCENTILES, course_distribution_rows, iter_live_gpas, resolve_engine
+from course_stats import course_stats, iter_course_stats, standard_deviation, student_ranks_statement
+from standings import DEFAULT_TOP, cohort_summary, standings_page_statement, top_students
+from gpa import (
+    GRADE_SCALE, GOOD_STANDING_GPA, DEANS_LIST_GPA, cached_gpa, cached_summary, iter_cached_gpas,
+    record_grade_points, find_gpa_drift, rebuild_gpa_cache,
+)
 
 
 def exit_program():
     """Safely exits the application with proper cleanup"""
     print("Goodbye!")
+    write_queue.close()
     session.close()
     exit()
 
 
+def commit_entry(work, saved_message, conflict_message, changes=()):
+    """Runs `work` (which adds rows to the session) and commits it; returns False if it conflicted
+
+    Once it's committed, cached reports depending on the `changes` tags are invalidated.
+    With the write queue on, the work joins the next group commit instead and the messages
+    are printed once it's saved (in a batch, later but in order), so only validation failures
+    return False.
+    """
+    writer = write_queue.get_queue()
+    if writer is None:
+        try:
+            work()
+            session.commit()
+        except IntegrityError:
+            session.rollback()
+            print(conflict_message)
+            return False
+        report_cache.changed(*changes)
+        print(saved_message)
+        return True
+
+    def acknowledge(future):
+        error = future.exception()
+        if error is None:
+            report_cache.changed(*changes)
+            print(saved_message)
+        elif isinstance(error, IntegrityError):
+            print(conflict_message)
+        else:
+            print(f"Could not save: {error}")
+
+    writer.submit(work, acknowledge)
+    writer.acknowledge(wait=not write_queue.batching())
+    return True
+
+
 def clear_screen():
     """Clears the terminal for better readability"""
     os.system('cls' if os.name == 'nt' else 'clear')
@@ -19,34 +76,15 @@ def clear_screen():
 
 def format_grade(score):
     """Converts numerical scores to letter grades"""
-    if score >= 90:
-        return 'A'
-    elif score >= 80:
-        return 'B'
-    elif score >= 70:
-        return 'C'
-    elif score >= 60:
-        return 'D'
-    else:
-        return 'F'
+    for cutoff, letter, _ in GRADE_SCALE:
+        if score >= cutoff:
+            return letter
+    return GRADE_SCALE[-1][1]
 
 
 def calculate_gpa(student_id):
     """Calculates GPA for a given student"""
-    grades = session.query(Grade).filter_by(student_id=student_id).all()
-    if not grades:
-        return 0.0
-
-    total_points = 0
-    total_credits = 0
-
-    for grade in grades:
-        letter = format_grade(grade.score)
-        points = {'A': 4.0, 'B': 3.0, 'C': 2.0, 'D': 1.0, 'F': 0.0}[letter]
-        total_points += points * grade.course.credits
-        total_credits += grade.course.credits
-
-    return total_points / total_credits if total_credits > 0 else 0.0
+    return cached_gpa(student_id)
 
 
 def validate_email(email):
@@ -55,23 +93,42 @@ def validate_email(email):
 
 
 def display_student_report(student):
-    """Generates formatted student reports"""
-    print(f"\nSTUDENT REPORT: {student.first_name} {student.last_name} (ID: {student.id})")
-    print("-" * 50)
-    print(f"Email: {student.email}")
-    print(f"Enrollment Date: {student.enrollment_date.strftime('%Y-%m-%d') if student.enrollment_date else 'N/A'}")
+    """Generates formatted student reports (reused until the student's details or grades change)"""
+    report_cache.printed(
+        ('student_report', student.id),
+        [('student', student.id)],
+        lambda out: write_student_report(student, out),
+    )
+
+
+def write_student_report(student, out=None):
+    """Prints a student's details, grades and cached GPA"""
+    grades = fetch_all(
+        select(Course.code, Course.name, Grade.score)
+        .join(Grade, Grade.course_id == Course.id)
+        .where(Grade.student_id == student.id)
+        .order_by(Grade.id)
+    )
+    print_student_report(student, grades, cached_summary(student.id) if grades else None, out)
+
+
+def print_student_report(student, grades, summary, out=None):
+    """Prints a student report from already fetched (code, name, score) grades and (GPA, standing) summary"""
+    out = out or sys.stdout
+    print(f"\nSTUDENT REPORT: {student.first_name} {student.last_name} (ID: {student.id})", file=out)
+    print("-" * 50, file=out)
+    print(f"Email: {student.email}", file=out)
+    print(f"Enrollment Date: {student.enrollment_date.strftime('%Y-%m-%d') if student.enrollment_date else 'N/A'}", file=out)
 
-    grades = session.query(Grade).filter_by(student_id=student.id).all()
     if grades:
-        print("\nCOURSES & GRADES:")
-        for grade in grades:
-            letter = format_grade(grade.score)
-            print(f"• {grade.course.code}: {grade.course.name} - {letter} ({grade.score:.1f}%)")
-        gpa = calculate_gpa(student.id)
-        print(f"\nOVERALL GPA: {gpa:.2f}")
-        print(f"STATUS: {'Good Standing' if gpa >= 2.0 else 'Academic Probation'}")
+        print("\nCOURSES & GRADES:", file=out)
+        for code, name, score in grades:
+            letter = format_grade(score)
+            print(f"• {code}: {name} - {letter} ({score:.1f}%)", file=out)
+        print(f"\nOVERALL GPA: {summary.gpa if summary else 0.0:.2f}", file=out)
+        print(f"STATUS: {summary.standing if summary else 'Academic Probation'}", file=out)
     else:
-        print("\nNo grades recorded yet.")
+        print("\nNo grades recorded yet.", file=out)
 
 
 # Student Management Functions
@@ -104,62 +161,73 @@ def manage_students():
             print("Invalid choice")
 
 
+@tracked
 def list_students():
     """Lists all students"""
-    students = session.query(Student).all()
-    if not students:
-        print("No students found.")
-        return
+    def header():
+        print("\nALL STUDENTS:")
+        print("-" * 50)
+
+    def render(row):
+        student_id, first_name, last_name, email = row
+        print(f"ID: {student_id} | {first_name} {last_name} | {email}")
 
-    print("\nALL STUDENTS:")
-    print("-" * 50)
-    for student in students:
-        print(f"ID: {student.id} | {student.first_name} {student.last_name} | {student.email}")
+    statement = select(Student.id, Student.first_name, Student.last_name, Student.email)
+    if not browse(statement, Student.id, render, header):
+        print("No students found.")
 
 
+@tracked
 def add_student():
     """Adds a new student"""
     print("\nADD NEW STUDENT")
     first_name = input("First Name: ").strip()
     last_name = input("Last Name: ").strip()
     email = input("Email: ").strip()
+    create_student(first_name, last_name, email)
 
+
+def create_student(first_name, last_name, email):
+    """Validates and saves a new student without prompting; returns True on success"""
     if not all([first_name, last_name, email]):
         print("All fields are required.")
-        return
+        return False
 
     if not validate_email(email):
         print("Invalid email format.")
-        return
+        return False
 
-    try:
-        student = Student(first_name=first_name, last_name=last_name, email=email)
-        session.add(student)
-        session.commit()
-        print(f"Student {first_name} {last_name} added successfully!")
-    except IntegrityError:
-        session.rollback()
-        print("Email already exists.")
+    return commit_entry(
+        lambda: session.add(Student(first_name=first_name, last_name=last_name, email=email)),
+        f"Student {first_name} {last_name} added successfully!",
+        "Email already exists.",
+        changes=[('students',)],
+    )
 
 
+@tracked
 def search_student():
     """Searches for a student by name or email"""
     query = input("Enter student name or email to search: ").strip()
-    students = session.query(Student).filter(
-        (Student.first_name.ilike(f'%{query}%')) |
-        (Student.last_name.ilike(f'%{query}%')) |
-        (Student.email.ilike(f'%{query}%'))
-    ).all()
+    print_search_results(query)
+
+
+def print_search_results(query):
+    """Prints the best matches for a name or email search"""
+    students = search_students(query, limit=SEARCH_LIMIT)
 
     if not students:
         print("No students found.")
         return
 
     print("\nSEARCH RESULTS:")
-    for student in students:
-        print(f"ID: {student.id} | {student.first_name} {student.last_name} | {student.email}")
+    for student_id, first_name, last_name, email in students:
+        print(f"ID: {student_id} | {first_name} {last_name} | {email}")
+    if len(students) == SEARCH_LIMIT:
+        print(f"(showing the best {SEARCH_LIMIT} matches; refine your search to see others)")
 
 
+@tracked
 def update_student():
     """Updates student information"""
     student_id = input("Enter student ID to update: ").strip()
@@ -188,12 +256,16 @@ def update_student():
         student.last_name = last_name
         student.email = email
         session.commit()
+        forget_student(student_id)
+        # Names show up in course grade pages and the all-GPAs list too
+        report_cache.changed(('student', student_id), ('students',))
         print("Student updated successfully!")
     except IntegrityError:
         session.rollback()
         print("Email already exists.")
 
 
+@tracked
 def delete_student():
     """Deletes a student"""
     student_id = input("Enter student ID to delete: ").strip()
@@ -212,6 +284,9 @@ def delete_student():
     if confirm == 'y':
         session.delete(student)
         session.commit()
+        forget_student(student_id)
+        # Their grades go too, so course pages and GPA lists change as well
+        report_cache.changed(('student', student_id), ('students',))
         print("Student deleted successfully!")
     else:
         print("Deletion cancelled.")
@@ -226,7 +301,8 @@ def manage_courses():
         print("2. Create New Course")
         print("3. Enroll Student in Course")
         print("4. View Course Enrollment")
-        print("5. Back to Main Menu")
+        print("5. Bulk Enroll / Sync Roster")
+        print("6. Back to Main Menu")
 
         choice = input("> ")
 
@@ -239,142 +315,242 @@ def manage_courses():
         elif choice == "4":
             view_course_enrollment()
         elif choice == "5":
+            bulk_enroll()
+        elif choice == "6":
             break
         else:
             print("Invalid choice")
 
 
+@tracked
 def list_courses():
     """Lists all courses"""
-    courses = session.query(Course).all()
-    if not courses:
-        print("No courses found.")
-        return
+    def header():
+        print("\nALL COURSES:")
+        print("-" * 50)
 
-    print("\nALL COURSES:")
-    print("-" * 50)
-    for course in courses:
-        print(f"{course.code}: {course.name} ({course.credits} credits)")
+    def render(row):
+        _, code, name, credits = row
+        print(f"{code}: {name} ({credits} credits)")
+
+    statement = select(Course.id, Course.code, Course.name, Course.credits)
+    if not browse(statement, Course.id, render, header):
+        print("No courses found.")
 
 
+@tracked
 def create_course():
     """Creates a new course"""
     print("\nCREATE NEW COURSE")
     code = input("Course Code (e.g., CS101): ").strip().upper()
     name = input("Course Name: ").strip()
     credits = input("Credits: ").strip()
+    add_course(code, name, credits)
+
 
+def add_course(code, name, credits):
+    """Validates and saves a new course without prompting; returns True on success"""
+    code = str(code).strip().upper()
     if not all([code, name, credits]):
         print("All fields are required.")
-        return
+        return False
 
     try:
         credits = int(credits)
     except ValueError:
         print("Credits must be a number.")
-        return
+        return False
 
     try:
         course = Course(code=code, name=name, credits=credits)
         session.add(course)
         session.commit()
+        forget_course(code)
         print(f"Course {code} created successfully!")
+        return True
     except IntegrityError:
         session.rollback()
         print("Course code already exists.")
+        return False
 
 
+@tracked
 def enroll_student():
     """Enrolls a student in a course"""
     student_id = input("Enter student ID: ").strip()
     course_code = input("Enter course code: ").strip().upper()
+    enroll(student_id, course_code)
 
+
+def enroll(student_id, course_code):
+    """Enrolls a student in a course without prompting; returns True on success"""
     try:
         student_id = int(student_id)
     except ValueError:
         print("Invalid student ID.")
-        return
+        return False
 
-    student = session.query(Student).get(student_id)
+    student = resolve_student(student_id)
     if not student:
         print("Student not found.")
-        return
+        return False
 
-    course = session.query(Course).filter_by(code=course_code).first()
+    course = find_course(course_code)
     if not course:
-        print("Course not found.")
-        return
+        return False
 
-    if course in student.courses:
+    if is_enrolled(student.id, course.id):
         print("Student is already enrolled in this course.")
-        return
+        return False
 
-    student.courses.append(course)
-    session.commit()
-    print(f"Student {student.first_name} {student.last_name} enrolled in {course.code} successfully!")
+    return commit_entry(
+        lambda: session.execute(insert(enrollments).values(student_id=student.id, course_id=course.id)),
+        f"Student {student.first_name} {student.last_name} enrolled in {course.code} successfully!",
+        "Student is already enrolled in this course.",
+    )
 
 
-def view_course_enrollment():
-    """Views enrollment for a specific course"""
+@tracked
+def bulk_enroll():
+    """Enrolls a list of students in a course, optionally dropping everyone not on the list"""
     course_code = input("Enter course code: ").strip().upper()
-    course = session.query(Course).filter_by(code=course_code).first()
-
+    source = input("Student IDs (comma-separated) or a file of IDs: ").strip()
+    if os.path.isfile(source):
+        student_ids, rejected = read_student_ids(source)
+        for line_number, value in rejected[:10]:
+            print(f"Line {line_number}: not a student ID: {value}")
+    else:
+        try:
+            student_ids = parse_student_ids(source)
+        except ValueError:
+            print("Invalid student ID list.")
+            return
+    sync = input("Drop enrolled students who aren't listed? (y/n): ").lower() == 'y'
+    sync_roster(course_code, student_ids, sync)
+
+
+def sync_roster(course_code, student_ids, sync=False, dry_run=False):
+    """Adds (and with sync, drops) enrollments so a course's roster matches a list, without prompting; returns True on success"""
+    course = find_course(course_code)
+    if not course:
+        return False
+    if not student_ids and not sync:
+        print("No student IDs given.")
+        return False
+
+    adds, drops, unknown = plan_roster(course.id, student_ids, sync)
+    if unknown:
+        shown = ', '.join(str(student_id) for student_id in unknown[:10])
+        print(f"{len(unknown)} unknown student ID(s) skipped: {shown}{' ...' if len(unknown) > 10 else ''}")
+    if not dry_run:
+        apply_roster(course.id, adds, drops)
+    enrolled, dropped = ("Would enroll", "drop") if dry_run else ("Enrolled", "dropped")
+    print(f"{enrolled} {len(adds)} and {dropped} {len(drops)} student(s) in {course.code}; "
+          f"{len(set(student_ids)) - len(adds) - len(unknown)} already enrolled.")
+    return True
+
+
+def find_course(course_code):
+    """Looks up a course by code (cached); prints a message and returns None if it doesn't exist"""
+    course = course_by_code(course_code)
     if not course:
         print("Course not found.")
-        return
+    return course
 
-    print(f"\nENROLLMENT FOR {course.code}: {course.name}")
-    print("-" * 50)
 
-    if not course.students:
-        print("No students enrolled.")
+@tracked
+def view_course_enrollment():
+    """Views enrollment for a specific course"""
+    course_code = input("Enter course code: ").strip().upper()
+    course = find_course(course_code)
+    if not course:
         return
 
-    for student in course.students:
-        print(f"ID: {student.id} | {student.first_name} {student.last_name}")
+    def header():
+        print(f"\nENROLLMENT FOR {course.code}: {course.name}")
+        print("-" * 50)
+
+    def render(row):
+        student_id, first_name, last_name = row
+        print(f"ID: {student_id} | {first_name} {last_name}")
+
+    statement = (
+        select(Student.id, Student.first_name, Student.last_name)
+        .join(enrollments, enrollments.c.student_id == Student.id)
+        .where(enrollments.c.course_id == course.id)
+    )
+    if not browse(statement, Student.id, render, header):
+        header()
+        print("No students enrolled.")
 
 
 # Grade Recording Functions
+@tracked
 def record_grades():
     """Records grades for students"""
     student_id = input("Enter student ID: ").strip()
     course_code = input("Enter course code: ").strip().upper()
 
+    enrollment = find_enrollment(student_id, course_code)
+    if not enrollment:
+        return
+
+    score = input("Enter score (0-100): ").strip()
+    assignment_name = input("Assignment name (optional): ").strip()
+    save_grade(*enrollment, score, assignment_name)
+
+
+def find_enrollment(student_id, course_code):
+    """Looks up a student and a course they take; prints why and returns None if grading isn't possible"""
     try:
         student_id = int(student_id)
     except ValueError:
         print("Invalid student ID.")
-        return
+        return None
 
-    student = session.query(Student).get(student_id)
+    student = resolve_student(student_id)
     if not student:
         print("Student not found.")
-        return
+        return None
 
-    course = session.query(Course).filter_by(code=course_code).first()
+    course = find_course(course_code)
     if not course:
-        print("Course not found.")
-        return
+        return None
 
-    if course not in student.courses:
+    enrolled = is_enrolled(student.id, course.id)
+    if not enrolled and write_queue.flush():
+        # The enrollment may still have been waiting in the write queue
+        enrolled = is_enrolled(student.id, course.id)
+    if not enrolled:
         print("Student is not enrolled in this course.")
-        return
+        return None
+
+    return student, course
 
-    score = input("Enter score (0-100): ").strip()
-    assignment_name = input("Assignment name (optional): ").strip()
 
+def save_grade(student, course, score, assignment_name=None):
+    """Validates a score and records it for an enrolled student without prompting; returns True on success"""
     try:
         score = float(score)
         if not 0 <= score <= 100:
             raise ValueError
     except ValueError:
         print("Score must be a number between 0 and 100.")
-        return
+        return False
+
+    def work():
+        session.execute(insert(Grade.__table__), {
+            'student_id': student.id, 'course_id': course.id, 'score': score,
+            'assignment_name': assignment_name or None, 'date_recorded': datetime.now(),
+        })
+        record_grade_points(student.id, course.credits, score)
 
-    grade = Grade(student_id=student_id, course_id=course.id, score=score, assignment_name=assignment_name or None)
-    session.add(grade)
-    session.commit()
-    print(f"Grade recorded: {format_grade(score)} ({score:.1f}%) for {student.first_name} {student.last_name} in {course.code}")
+    return commit_entry(
+        work,
+        f"Grade recorded: {format_grade(score)} ({score:.1f}%) for {student.first_name} {student.last_name} in {course.code}",
+        "Grade could not be recorded.",
+        changes=[('student', student.id), ('course', course.id), ('gpa',)],
+    )
 
 
 # Report Functions
@@ -384,7 +560,10 @@ def view_reports():
         print("\n=== VIEW REPORTS ===")
         print("1. Student Performance Report")
         print("2. Course Grade Report")
-        print("3. Back to Main Menu")
+        print("3. Grade Distribution by Course")
+        print("4. Course Statistics")
+        print("5. All Courses Summary")
+        print("6. Back to Main Menu")
 
         choice = input("> ")
 
@@ -393,53 +572,250 @@ def view_reports():
         elif choice == "2":
             course_grade_report()
         elif choice == "3":
+            grade_distribution_report()
+        elif choice == "4":
+            course_statistics_report()
+        elif choice == "5":
+            all_courses_summary()
+        elif choice == "6":
             break
         else:
             print("Invalid choice")
 
 
+@tracked
 def student_performance_report():
     """Shows detailed student performance"""
     student_id = input("Enter student ID: ").strip()
+    show_student_report(student_id)
+
+
+def show_student_report(student_id):
+    """Prints a student's report without prompting; returns True if the student exists"""
+    student = find_student(student_id)
+    if not student:
+        return False
+
+    display_student_report(student)
+    return True
+
+
+def resolve_student(student_id):
+    """student_by_id, waiting for the write queue first if the student may still be queued"""
+    student = student_by_id(student_id)
+    if not student and write_queue.flush():
+        student = student_by_id(student_id)
+    return student
+
+
+def find_student(student_id):
+    """Looks up a student by ID (cached); prints a message and returns None if the ID is invalid or unknown"""
     try:
         student_id = int(student_id)
     except ValueError:
         print("Invalid ID.")
-        return
+        return None
 
-    student = session.query(Student).get(student_id)
+    student = resolve_student(student_id)
     if not student:
         print("Student not found.")
-        return
-
-    display_student_report(student)
+    return student
 
 
+@tracked
 def course_grade_report():
     """Shows grades for a specific course"""
     course_code = input("Enter course code: ").strip().upper()
-    course = session.query(Course).filter_by(code=course_code).first()
+    course = find_course(course_code)
+    if not course:
+        return
+
+    def header():
+        print(f"\nGRADES FOR {course.code}: {course.name}")
+        print("-" * 60)
+        print("Student Name".ljust(20) + "Score".ljust(8) + "Grade".ljust(6) + "Assignment")
+        print("-" * 60)
 
+    def render(row):
+        print(format_course_grade_row(*row[1:]))
+
+    cache = (('course_grades', course.id), [('course', course.id), ('students',)])
+    if not browse(course_grades_statement(course.id), Grade.id, render, header, cache=cache):
+        print("No grades recorded for this course.")
+
+
+def format_course_grade_row(first_name, last_name, score, assignment_name):
+    """One line of the course grade table"""
+    student_name = f"{first_name} {last_name}"
+    letter = format_grade(score)
+    score = f"{score:.1f}%"
+    assignment = assignment_name or "N/A"
+    return f"{student_name[:19].ljust(20)}{score.ljust(8)}{letter.ljust(6)}{assignment}"
+
+
+def course_grades_statement(course_id):
+    """(grade id, first name, last name, score, assignment) rows for a course"""
+    return (
+        select(Grade.id, Student.first_name, Student.last_name, Grade.score, Grade.assignment_name)
+        .join(Student, Student.id == Grade.student_id)
+        .where(Grade.course_id == course_id)
+    )
+
+
+def write_course_grades(course_code, fmt='text', out=None):
+    """Streams every grade for a course as a text table or CSV without paging; returns True if the course exists"""
+    course = find_course(course_code)
+    if not course:
+        return False
+
+    out = out or sys.stdout
+    rows = iter_rows(course_grades_statement(course.id).order_by(Grade.id))
+    if fmt == 'csv':
+        writer = csv.writer(out)
+        writer.writerow(['student_name', 'score', 'grade', 'assignment'])
+        for _, first_name, last_name, score, assignment_name in rows:
+            writer.writerow([f"{first_name} {last_name}", f"{score:.1f}", format_grade(score), assignment_name or ""])
+        return True
+
+    print(f"\nGRADES FOR {course.code}: {course.name}", file=out)
+    print("-" * 60, file=out)
+    print("Student Name".ljust(20) + "Score".ljust(8) + "Grade".ljust(6) + "Assignment", file=out)
+    print("-" * 60, file=out)
+    for row in rows:
+        print(format_course_grade_row(*row[1:]), file=out)
+    return True
+
+
+@tracked
+def grade_distribution_report():
+    """Shows letter counts, mean and percentiles for every course"""
+    write_grade_distribution()
+
+
+def write_grade_distribution(fmt='text', engine=None, out=None):
+    """Prints the grade distribution of every course using the sql or numpy analytics engine"""
+    out = out or sys.stdout
+    rows = course_distribution_rows(engine)
+    if fmt == 'csv':
+        writer = csv.writer(out)
+        writer.writerow(['course_code', 'course_name', *LETTERS, 'mean', *(f"p{p}" for p in PERCENTILES)])
+        for code, name, counts, mean, percentiles in rows:
+            writer.writerow([code, name, *counts, f"{mean:.2f}", *(f"{percentiles[p]:.1f}" for p in PERCENTILES)])
+        return True
+
+    if not rows:
+        print("No grades recorded yet.", file=out)
+        return True
+    print("\nGRADE DISTRIBUTION BY COURSE", file=out)
+    print("-" * 82, file=out)
+    print("Course".ljust(10) + "".join(letter.rjust(6) for letter in LETTERS) + "Mean".rjust(7)
+          + "".join(f"p{p}".rjust(7) for p in PERCENTILES), file=out)
+    print("-" * 82, file=out)
+    for code, _, counts, mean, percentiles in rows:
+        print(code[:9].ljust(10) + "".join(f"{count:6}" for count in counts) + f"{mean:7.1f}"
+              + "".join(f"{percentiles[p]:7.1f}" for p in PERCENTILES), file=out)
+    return True
+
+
+@tracked
+def course_statistics_report():
+    """Shows one course's statistics, letter histogram and student ranking"""
+    course_code = input("Enter course code: ").strip().upper()
+    course = find_course(course_code)
     if not course:
-        print("Course not found.")
         return
 
-    grades = session.query(Grade).filter_by(course_id=course.id).all()
-    if not grades:
+    stats = course_stats(course.id)
+    if not stats:
         print("No grades recorded for this course.")
         return
+    print_course_stats(stats)
 
-    print(f"\nGRADES FOR {course.code}: {course.name}")
-    print("-" * 60)
-    print("Student Name".ljust(20) + "Score".ljust(8) + "Grade".ljust(6) + "Assignment")
-    print("-" * 60)
+    statement, position = student_ranks_statement(course.id)
+    browse(statement, position, lambda row: print(format_rank_row(*row[1:])), print_rank_header)
 
-    for grade in grades:
-        student_name = f"{grade.student.first_name} {grade.student.last_name}"
-        score = f"{grade.score:.1f}%"
-        letter = format_grade(grade.score)
-        assignment = grade.assignment_name or "N/A"
-        print(f"{student_name[:19].ljust(20)}{score.ljust(8)}{letter.ljust(6)}{assignment}")
+
+def print_course_stats(stats, out=None):
+    """Summary block and letter-grade histogram for one course's stats row"""
+    out = out or sys.stdout
+    print(f"\nSTATISTICS FOR {stats.code}: {stats.name}", file=out)
+    print("-" * 60, file=out)
+    print(f"Grades: {stats.count}   Mean: {stats.mean:.1f}   Median: {stats.median:.1f}   "
+          f"Std dev: {standard_deviation(stats):.1f}", file=out)
+    print(f"Lowest: {stats.min:.1f}   Highest: {stats.max:.1f}", file=out)
+    print("\nGRADE HISTOGRAM:", file=out)
+    widest = max(getattr(stats, letter) for _, letter, _ in GRADE_SCALE) or 1
+    for _, letter, _ in GRADE_SCALE:
+        count = getattr(stats, letter)
+        print(f"{letter}  {'#' * round(40 * count / widest)} {count}", file=out)
+
+
+def print_rank_header(out=None):
+    out = out or sys.stdout
+    print("\nSTUDENT RANKING (by average score in the course):", file=out)
+    print("-" * 60, file=out)
+    print("Rank".ljust(6) + "Student Name".ljust(25) + "Grades".ljust(8) + "Average".ljust(9) + "Pct", file=out)
+    print("-" * 60, file=out)
+
+
+def format_rank_row(student_id, first_name, last_name, grades, average, rank, percentile):
+    """One line of the course ranking table"""
+    student_name = f"{first_name} {last_name}"
+    return (f"{str(rank).ljust(6)}{student_name[:24].ljust(25)}{str(grades).ljust(8)}"
+            f"{f'{average:.1f}'.ljust(9)}{percentile:.0f}")
+
+
+def write_course_stats(course_code, out=None):
+    """Prints a course's statistics and full ranking without paging; returns True if the course exists"""
+    course = find_course(course_code)
+    if not course:
+        return False
+
+    out = out or sys.stdout
+    stats = course_stats(course.id)
+    if not stats:
+        print("No grades recorded for this course.", file=out)
+        return True
+    print_course_stats(stats, out)
+    print_rank_header(out)
+    statement, position = student_ranks_statement(course.id)
+    for row in iter_rows(statement.order_by(position)):
+        print(format_rank_row(*row[1:]), file=out)
+    return True
+
+
+@tracked
+def all_courses_summary():
+    """Shows statistics for every course from a single query"""
+    write_courses_summary()
+
+
+def write_courses_summary(fmt='text', out=None):
+    """Prints count, mean, median, spread and letter counts for every graded course"""
+    out = out or sys.stdout
+    letters = [letter for _, letter, _ in GRADE_SCALE]
+    rows = iter_course_stats()
+    if fmt == 'csv':
+        writer = csv.writer(out)
+        writer.writerow(['course_code', 'course_name', 'grades', 'mean', 'median', 'std_dev', 'min', 'max', *letters])
+        for row in rows:
+            writer.writerow([row.code, row.name, row.count, f"{row.mean:.2f}", f"{row.median:.2f}",
+                             f"{standard_deviation(row):.2f}", row.min, row.max, *(getattr(row, l) for l in letters)])
+        return True
+
+    first = next(iter(rows), None)
+    if first is None:
+        print("No grades recorded yet.", file=out)
+        return True
+    print("\nALL COURSES SUMMARY", file=out)
+    print("-" * 88, file=out)
+    print("Course".ljust(10) + "Grades".rjust(7) + "Mean".rjust(7) + "Median".rjust(8) + "StdDev".rjust(8)
+          + "Min".rjust(7) + "Max".rjust(7) + "".join(letter.rjust(6) for letter in letters), file=out)
+    print("-" * 88, file=out)
+    for row in itertools.chain([first], rows):
+        print(row.code[:9].ljust(10) + f"{row.count:7}{row.mean:7.1f}{row.median:8.1f}{standard_deviation(row):8.1f}"
+              f"{row.min:7.1f}{row.max:7.1f}" + "".join(f"{getattr(row, letter):6}" for letter in letters), file=out)
+    return True
 
 
 # GPA Functions
@@ -449,7 +825,9 @@ def calculate_gpas():
         print("\n=== CALCULATE GPAS ===")
         print("1. Calculate GPA for Specific Student")
         print("2. Show All Students GPAs")
-        print("3. Back to Main Menu")
+        print("3. Verify/Rebuild GPA Cache")
+        print("4. Class Standings")
+        print("5. Back to Main Menu")
 
         choice = input("> ")
 
@@ -458,42 +836,192 @@ def calculate_gpas():
         elif choice == "2":
             all_students_gpa()
         elif choice == "3":
+            verify_gpa_cache()
+        elif choice == "4":
+            class_standings()
+        elif choice == "5":
             break
         else:
             print("Invalid choice")
 
 
+@tracked
 def specific_student_gpa():
     """Calculates GPA for a specific student"""
     student_id = input("Enter student ID: ").strip()
-    try:
-        student_id = int(student_id)
-    except ValueError:
-        print("Invalid ID.")
-        return
+    show_student_gpa(student_id)
 
-    student = session.query(Student).get(student_id)
+
+def show_student_gpa(student_id, fmt='text'):
+    """Prints one student's GPA without prompting; returns True if the student exists"""
+    student = find_student(student_id)
     if not student:
-        print("Student not found.")
-        return
+        return False
+
+    gpa = calculate_gpa(student.id)
+    if fmt == 'csv':
+        write_gpa_csv([(student.id, student.first_name, student.last_name, gpa)])
+    else:
+        print(f"\nGPA for {student.first_name} {student.last_name}: {gpa:.2f}")
+    return True
+
 
-    gpa = calculate_gpa(student_id)
-    print(f"\nGPA for {student.first_name} {student.last_name}: {gpa:.2f}")
+def write_gpa_csv(rows, out=None):
+    """Writes (student id, first name, last name, GPA) rows as CSV"""
+    writer = csv.writer(out or sys.stdout)
+    writer.writerow(['student_id', 'student_name', 'gpa'])
+    for student_id, first_name, last_name, gpa in rows:
+        writer.writerow([student_id, f"{first_name} {last_name}", f"{gpa:.2f}"])
 
 
+@tracked
 def all_students_gpa():
     """Shows GPAs for all students"""
-    students = session.query(Student).all()
-    if not students:
+    # Any grade or student change alters the list, so it's only reused between changes
+    tags = [('gpa',), ('students',)]
+    if resolve_engine() == 'numpy':
+        report_cache.printed(('live_gpas',), tags, write_live_gpas)
+    elif not report_cache.printed(('all_students_gpa',), tags, write_cached_gpas):
         print("No students found.")
+
+
+def write_cached_gpas(out=None):
+    """Prints every student's cached GPA (nothing if there are no students)"""
+    out = out or sys.stdout
+    rows = iter_cached_gpas()
+    first = next(rows, None)
+    if first is None:
+        return
+
+    print("\nALL STUDENTS GPAs:", file=out)
+    print("-" * 40, file=out)
+    print("Student Name".ljust(25) + "GPA", file=out)
+    print("-" * 40, file=out)
+    for _, first_name, last_name, gpa in itertools.chain([first], rows):
+        student_name = f"{first_name} {last_name}"
+        print(f"{student_name[:24].ljust(25)}{gpa:.2f}", file=out)
+
+
+def write_live_gpas(engine=None, out=None):
+    """Prints every student's GPA and percentile rank, computed from the grades table by an analytics engine"""
+    out = out or sys.stdout
+    print("\nALL STUDENTS GPAs:", file=out)
+    print("-" * 40, file=out)
+    print("Student Name".ljust(25) + "GPA".ljust(7) + "Pct", file=out)
+    print("-" * 40, file=out)
+    for _, first_name, last_name, gpa, rank in iter_live_gpas(engine):
+        student_name = f"{first_name} {last_name}"
+        rank = f"{rank:.0f}" if rank is not None else "N/A"
+        print(f"{student_name[:24].ljust(25)}{gpa:.2f}".ljust(32) + rank, file=out)
+
+
+@tracked
+def class_standings():
+    """Shows rank, percentile and standing for a cohort (everyone, a course or an enrollment year)"""
+    course_code = input("Course code (blank for all students): ").strip()
+    year = input("Enrollment year (blank for any): ").strip()
+    top = input(f"Show top N (blank to page through everyone, e.g. {DEFAULT_TOP}): ").strip()
+    cohort = resolve_cohort(course_code, year)
+    if cohort is None:
+        return
+    try:
+        top = int(top) if top else None
+    except ValueError:
+        print("Invalid number.")
+        return
+
+    if top is not None:
+        write_standings(*cohort, top=top)
+        return
+    if not print_cohort_summary(*cohort):
+        return
+    statement, position = standings_page_statement(*cohort)
+    browse(statement, position, lambda row: print(format_standing_row(*row[1:])), print_standings_header)
+
+
+def resolve_cohort(course_code=None, year=None):
+    """(course id, year) filters for the standings; prints a message and returns None if either is invalid"""
+    course_id = None
+    if course_code:
+        course = find_course(course_code)
+        if not course:
+            return None
+        course_id = course.id
+    if year:
+        try:
+            year = int(year)
+        except ValueError:
+            print("Invalid year.")
+            return None
+    return course_id, year or None
+
+
+def print_cohort_summary(course_id=None, year=None, out=None):
+    """Prints the cohort size and cut-off counts; returns False if the cohort has no graded students"""
+    out = out or sys.stdout
+    students, deans_list, probation, mean_gpa = cohort_summary(course_id, year)
+    if not students:
+        print("No students with grades in this group.", file=out)
+        return False
+    print(f"\nCLASS STANDINGS: {students} students, mean GPA {mean_gpa:.2f}", file=out)
+    print(f"Dean's List (GPA >= {DEANS_LIST_GPA:.2f}): {deans_list}   "
+          f"Academic Probation (GPA < {GOOD_STANDING_GPA:.2f}): {probation}", file=out)
+    return True
+
+
+def print_standings_header(out=None):
+    out = out or sys.stdout
+    print("-" * 70, file=out)
+    print("Rank".ljust(7) + "Student Name".ljust(25) + "GPA".ljust(7) + "Pct".ljust(8) + "Standing", file=out)
+    print("-" * 70, file=out)
+
+
+def format_standing_row(student_id, first_name, last_name, gpa, rank, percentile, standing):
+    """One line of the class standings table"""
+    student_name = f"{first_name} {last_name}"
+    return f"{str(rank).ljust(7)}{student_name[:24].ljust(25)}{f'{gpa:.2f}'.ljust(7)}{f'{percentile:.1f}'.ljust(8)}{standing}"
+
+
+def write_standings(course_id=None, year=None, top=None, fmt='text', out=None):
+    """Prints a cohort's standings (all of them, or the top N) without paging"""
+    out = out or sys.stdout
+    if top is not None:
+        rows = top_students(top, course_id, year)
+    else:
+        statement, position = standings_page_statement(course_id, year)
+        rows = iter_rows(statement.order_by(position))
+    if fmt == 'csv':
+        writer = csv.writer(out)
+        writer.writerow(['rank', 'student_id', 'student_name', 'gpa', 'percentile', 'standing'])
+        for _, student_id, first_name, last_name, gpa, rank, percentile, standing in rows:
+            writer.writerow([rank, student_id, f"{first_name} {last_name}", f"{gpa:.2f}", f"{percentile:.1f}", standing])
+        return True
+
+    if not print_cohort_summary(course_id, year, out):
+        return True
+    print_standings_header(out)
+    for row in rows:
+        print(format_standing_row(*row[1:]), file=out)
+    return True
+
+
+@tracked
+def verify_gpa_cache():
+    """Checks the cached GPAs against the grades table and offers to rebuild them"""
+    drift = find_gpa_drift()
+    if not drift:
+        print("GPA cache is up to date.")
         return
 
-    print("\nALL STUDENTS GPAs:")
-    print("-" * 40)
-    print("Student Name".ljust(25) + "GPA")
-    print("-" * 40)
+    print(f"\n{len(drift)} cached GPA(s) out of date:")
+    for student_id, cached, actual in drift[:20]:
+        cached = f"{cached:.2f}" if cached is not None else "missing"
+        print(f"ID: {student_id} | cached {cached} | actual {actual:.2f}")
 
-    for student in students:
-        gpa = calculate_gpa(student.id)
-        student_name = f"{student.first_name} {student.last_name}"
-        print(f"{student_name[:24].ljust(25)}{gpa:.2f}")
+    confirm = input("Rebuild the GPA cache now? (y/n): ").lower()
+    if confirm == 'y':
+        count = rebuild_gpa_cache()
+        report_cache.changed_everything()
+        print(f"GPA cache rebuilt for {count} students.")
+    else:
+        print("Rebuild cancelled.")
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# lib/importer.py
+
+import argparse
+import csv
+import json
+import time
+from collections import Counter, defaultdict
+from datetime import datetime
+from itertools import islice
+from sqlalchemy import insert, select
+from models import session, Student, Course, Grade, enrollments
+from gpa import apply_grade_deltas, score_points
+
+# How many rejected rows are kept for the end-of-run report
+REJECT_SAMPLE_SIZE = 20
+
+# Student IDs per enrollment lookup (keeps each IN list well under SQLite's bind limit)
+ENROLLMENT_PROBE_SIZE = 500
+
+
+def read_rows(path):
+    """Streams (line number, row dict) from a CSV or JSONL grade file"""
+    with open(path, newline='') as f:
+        if path.endswith(('.jsonl', '.json')):
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    yield line_number, json.loads(line)
+                except json.JSONDecodeError:
+                    yield line_number, None
+        else:
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, row
+
+
+def parse_row(row, student_ids, courses):
+    """Validates one raw row; returns (grade values, None) or (None, rejection reason)"""
+    if not isinstance(row, dict):
+        return None, "Malformed row"
+
+    try:
+        student_id = int(row.get('student_id'))
+    except (TypeError, ValueError):
+        return None, "Invalid student ID"
+    if student_id not in student_ids:
+        return None, "Student not found"
+
+    course = courses.get(str(row.get('course_code') or '').strip().upper())
+    if not course:
+        return None, "Course not found"
+
+    try:
+        score = float(row.get('score'))
+        if not 0 <= score <= 100:
+            raise ValueError
+    except (TypeError, ValueError):
+        return None, "Score must be a number between 0 and 100"
+
+    date_recorded = row.get('date_recorded')
+    try:
+        date_recorded = datetime.fromisoformat(date_recorded) if date_recorded else datetime.now()
+    except (TypeError, ValueError):
+        return None, "Invalid date"
+
+    course_id, credits = course
+    return {
+        'student_id': student_id,
+        'course_id': course_id,
+        'credits': credits or 0,
+        'score': score,
+        'assignment_name': (row.get('assignment_name') or '').strip() or None,
+        'date_recorded': date_recorded,
+    }, None
+
+
+def enrolled_pairs(student_ids):
+    """(student_id, course_id) enrollments for a batch of students"""
+    student_ids = list(student_ids)
+    pairs = set()
+    for i in range(0, len(student_ids), ENROLLMENT_PROBE_SIZE):
+        batch = student_ids[i:i + ENROLLMENT_PROBE_SIZE]
+        pairs.update(tuple(row) for row in session.execute(
+            select(enrollments.c.student_id, enrollments.c.course_id)
+            .where(enrollments.c.student_id.in_(batch))
+        ))
+    return pairs
+
+
+def import_grades(path, chunk_size=5000, rejects_path=None):
+    """Streams a CSV/JSONL grade file into the database in chunked transactions"""
+    start = time.perf_counter()
+    student_ids = set(session.scalars(select(Student.id)))
+    courses = {code: (course_id, credits) for course_id, code, credits in
+               session.execute(select(Course.id, Course.code, Course.credits))}
+
+    stats = {'read': 0, 'imported': 0, 'rejected': 0, 'chunks': 0}
+    reasons = Counter()
+    sample = []
+    rejects_file = open(rejects_path, 'w', newline='') if rejects_path else None
+    rejects_writer = csv.writer(rejects_file) if rejects_file else None
+    if rejects_writer:
+        rejects_writer.writerow(['line', 'reason'])
+
+    def reject(line_number, reason):
+        stats['rejected'] += 1
+        reasons[reason] += 1
+        if len(sample) < REJECT_SAMPLE_SIZE:
+            sample.append((line_number, reason))
+        if rejects_writer:
+            rejects_writer.writerow([line_number, reason])
+
+    rows = read_rows(path)
+    try:
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+            stats['read'] += len(chunk)
+
+            parsed = []
+            for line_number, row in chunk:
+                values, reason = parse_row(row, student_ids, courses)
+                if reason:
+                    reject(line_number, reason)
+                else:
+                    parsed.append((line_number, values))
+
+            pairs = enrolled_pairs({values['student_id'] for _, values in parsed})
+            grades = []
+            deltas = defaultdict(lambda: [0.0, 0])
+            for line_number, values in parsed:
+                if (values['student_id'], values['course_id']) not in pairs:
+                    reject(line_number, "Student is not enrolled in this course")
+                    continue
+                credits = values.pop('credits')
+                delta = deltas[values['student_id']]
+                delta[0] += score_points(values['score']) * credits
+                delta[1] += credits
+                grades.append(values)
+
+            if grades:
+                session.execute(insert(Grade.__table__), grades)
+                apply_grade_deltas((student_id, points, credits) for student_id, (points, credits) in deltas.items())
+                session.commit()
+                stats['imported'] += len(grades)
+            stats['chunks'] += 1
+    except BaseException:
+        session.rollback()
+        raise
+    finally:
+        if rejects_file:
+            rejects_file.close()
+
+    stats['seconds'] = time.perf_counter() - start
+    return stats, reasons, sample
+
+
+def print_import_report(stats, reasons, sample):
+    """Prints the rejected-rows report and throughput for an import run"""
+    print("\nIMPORT SUMMARY")
+    print("-" * 50)
+    print(f"Rows read: {stats['read']}")
+    print(f"Grades imported: {stats['imported']}")
+    print(f"Rows rejected: {stats['rejected']}")
+    seconds = stats['seconds']
+    rate = stats['read'] / seconds if seconds else 0.0
+    print(f"Elapsed: {seconds:.2f}s ({rate:,.0f} rows/s over {stats['chunks']} chunks)")
+
+    if reasons:
+        print("\nREJECTED ROWS:")
+        for reason, count in reasons.most_common():
+            print(f"• {reason}: {count}")
+        print("\nFirst rejected lines:")
+        for line_number, reason in sample:
+            print(f"Line {line_number}: {reason}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import grades from a CSV or JSONL file")
+    parser.add_argument('path', help="CSV (header: student_id,course_code,score[,assignment_name,date_recorded]) or .jsonl file")
+    parser.add_argument('--chunk-size', type=int, default=5000, help="rows per transaction")
+    parser.add_argument('--rejects', help="write every rejected line number and reason to this CSV file")
+    args = parser.parse_args()
+
+    print_import_report(*import_grades(args.path, args.chunk_size, args.rejects))
+
+
+if __name__ == "__main__":
+    main()
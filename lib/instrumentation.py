@@ -0,0 +1,172 @@
+# lib/instrumentation.py
+
+import atexit
+import json
+import os
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from functools import wraps
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Opt in with GRADES_PROFILE=1 (summary table on exit) or GRADES_PROFILE=<file>.json (JSON on exit)
+PROFILE_SETTING = os.environ.get('GRADES_PROFILE')
+
+# One statement run this many times with different parameters in one action looks like an N+1
+N_PLUS_ONE_THRESHOLD = 10
+
+# Label for queries issued outside any tracked action (startup, menu drawing)
+UNTRACKED = "(outside actions)"
+
+_enabled = False
+_labels = []
+_stats = defaultdict(lambda: {
+    'calls': 0, 'queries': 0, 'seconds': 0.0, 'rows': 0,
+    'statements': Counter(), 'parameters': defaultdict(set),
+})
+
+
+class _CountingCursor:
+    """Wraps a DBAPI cursor and adds fetched rows to the current action"""
+
+    def __init__(self, cursor, stats):
+        self._cursor = cursor
+        self._stats = stats
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is not None:
+            self._stats['rows'] += 1
+        return row
+
+    def fetchmany(self, *args):
+        rows = self._cursor.fetchmany(*args)
+        self._stats['rows'] += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        self._stats['rows'] += len(rows)
+        return rows
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+def current_label():
+    """The action queries are currently attributed to, e.g. '4 → course grade report'"""
+    return " → ".join(_labels) or UNTRACKED
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info['query_start'].pop()
+    stats = _stats[current_label()]
+    stats['queries'] += 1
+    stats['seconds'] += elapsed
+    stats['statements'][statement] += 1
+    seen = stats['parameters'][statement]
+    if len(seen) <= N_PLUS_ONE_THRESHOLD:
+        seen.add(repr(parameters))
+    if context is not None and cursor.description is not None:
+        context.cursor = _CountingCursor(cursor, stats)
+
+
+def enable(output=None):
+    """Starts attributing queries to actions; prints (or writes JSON to `output`) on exit"""
+    global _enabled
+    if _enabled:
+        return
+    _enabled = True
+    # Listening on the Engine class counts every engine, whenever it was created: the shared
+    # one, and in snapshot mode the file engine it's replaced by and the in-memory read engine
+    event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+    if output:
+        atexit.register(write_json, output)
+    else:
+        atexit.register(print_summary)
+
+
+@contextmanager
+def action(label):
+    """Attributes queries run inside the block to `label` (nested inside any enclosing action)"""
+    if not _enabled:
+        yield
+        return
+    _labels.append(label)
+    _stats[current_label()]['calls'] += 1
+    try:
+        yield
+    finally:
+        _labels.pop()
+
+
+def tracked(func):
+    """Decorator: attributes a helper's queries to its name, e.g. course_grade_report → 'course grade report'"""
+    label = func.__name__.replace('_', ' ')
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        with action(label):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def n_plus_one_suspects(stats):
+    """(count, statement) pairs repeated with different parameters often enough to look like N+1"""
+    return [
+        (count, statement) for statement, count in stats['statements'].most_common()
+        if count >= N_PLUS_ONE_THRESHOLD and len(stats['parameters'][statement]) > 1
+    ]
+
+
+def summary():
+    """Per-action totals as plain data"""
+    return {
+        label: {
+            'calls': stats['calls'],
+            'queries': stats['queries'],
+            'sql_ms': round(stats['seconds'] * 1000, 3),
+            'rows': stats['rows'],
+            'n_plus_one': [{'count': count, 'statement': statement}
+                           for count, statement in n_plus_one_suspects(stats)],
+        }
+        for label, stats in _stats.items()
+    }
+
+
+def print_summary():
+    """Prints the per-action query table and any N+1 suspects"""
+    data = summary()
+    if not data:
+        return
+    print("\n=== QUERY PROFILE ===")
+    print("Action".ljust(40) + "Calls".rjust(6) + "Queries".rjust(9) + "SQL ms".rjust(10) + "Rows".rjust(9))
+    print("-" * 74)
+    for label, row in sorted(data.items(), key=lambda item: -item[1]['sql_ms']):
+        print(f"{label[:39].ljust(40)}{row['calls']:6}{row['queries']:9}{row['sql_ms']:10.1f}{row['rows']:9}")
+
+    suspects = [(label, s) for label, row in data.items() for s in row['n_plus_one']]
+    if suspects:
+        print("\nLIKELY N+1 PATTERNS:")
+        for label, suspect in suspects:
+            statement = " ".join(suspect['statement'].split())
+            print(f"• {label}: {suspect['count']} × {statement[:100]}")
+
+
+def write_json(path):
+    """Writes the per-action summary to a JSON file"""
+    with open(path, 'w') as f:
+        json.dump(summary(), f, indent=2, ensure_ascii=False)
+
+
+if PROFILE_SETTING:
+    enable(PROFILE_SETTING if PROFILE_SETTING.endswith('.json') else None)
@@ -0,0 +1,115 @@
+# lib/lookups.py
+#
+# Bounded LRU caches for the lookups almost every prompt starts with: course by code and
+# student by ID. Entries are plain rows rather than ORM objects, so they aren't expired (and
+# reloaded) by every commit, and a grade-entry session resolves the same courses and students
+# without a round trip. Unknown codes and IDs aren't cached. Helpers that change a course or
+# student (create_course, update_student, delete_student) drop its entry, and both caches are
+# cleared whenever report_cache notices another process's commit (PRAGMA data_version moved).
+
+from collections import OrderedDict
+from sqlalchemy import exists, select
+from models import Student, Course, enrollments
+from rows import fetch_first, fetch_scalar
+import report_cache
+
+COURSE_CACHE_SIZE = 512
+STUDENT_CACHE_SIZE = 4096
+
+
+class LRUCache:
+    """Dict-like cache holding at most `size` entries, evicting the least recently used"""
+
+    def __init__(self, size):
+        self.size = size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        try:
+            value = self.entries[key]
+        except KeyError:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+
+    def discard(self, key):
+        self.entries.pop(key, None)
+
+    def clear(self):
+        self.entries.clear()
+
+    def __len__(self):
+        return len(self.entries)
+
+
+courses = LRUCache(COURSE_CACHE_SIZE)
+students = LRUCache(STUDENT_CACHE_SIZE)
+
+
+def clear():
+    courses.clear()
+    students.clear()
+
+
+report_cache.on_external_change(clear)
+
+
+def course_by_code(code):
+    """(id, code, name, credits) row for a course code, or None"""
+    code = str(code).strip().upper()
+    report_cache.check_external_changes()
+    course = courses.get(code)
+    if course is None:
+        course = fetch_first(select(Course.id, Course.code, Course.name, Course.credits).where(Course.code == code))
+        if course is not None:
+            courses.put(code, course)
+    return course
+
+
+def student_by_id(student_id):
+    """(id, first_name, last_name, email, enrollment_date) row for a student ID, or None"""
+    report_cache.check_external_changes()
+    student = students.get(student_id)
+    if student is None:
+        student = fetch_first(
+            select(Student.id, Student.first_name, Student.last_name, Student.email, Student.enrollment_date)
+            .where(Student.id == student_id)
+        )
+        if student is not None:
+            students.put(student_id, student)
+    return student
+
+
+def forget_course(code):
+    courses.discard(str(code).strip().upper())
+
+
+def forget_student(student_id):
+    students.discard(student_id)
+
+
+def is_enrolled_statement(student_id, course_id):
+    return select(exists().where(
+        enrollments.c.student_id == student_id,
+        enrollments.c.course_id == course_id,
+    ))
+
+
+def is_enrolled(student_id, course_id):
+    """True if the student takes the course (one probe of the enrollments primary key)"""
+    return fetch_scalar(is_enrolled_statement(student_id, course_id))
+
+
+def cache_stats():
+    """{'courses': (entries, hits, misses), 'students': (...)}"""
+    return {name: (len(cache), cache.hits, cache.misses) for name, cache in (('courses', courses), ('students', students))}
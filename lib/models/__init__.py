@@ -1,12 +1,110 @@
-from sqlalchemy import create_engine, Table, Column, Integer, DateTime, ForeignKey
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy import create_engine, event, Table, Column, Integer, DateTime, ForeignKey, Index, Select, CompoundSelect, TextClause
+from sqlalchemy.orm import sessionmaker, scoped_session, declarative_base, Session as BaseSession
+from sqlalchemy.pool import StaticPool
 from datetime import datetime
+from settings import DATABASE_URL, DATABASE_PROFILE, PROFILES, is_memory, sqlite_path
 
 # Database configuration
 Base = declarative_base()
-engine = create_engine('sqlite:///grades.db')
-Session = sessionmaker(bind=engine)
-session = Session()
+_engine = None
+
+# Engine that plain reads are sent to instead of _engine (the in-memory snapshot), or None
+_read_engine = None
+
+
+def apply_profile(dbapi_connection, profile=DATABASE_PROFILE, read_only=False):
+    """Runs a profile's PRAGMAs on a new SQLite connection
+
+    Read-only connections can't change the journal mode, so they skip it (WAL is a
+    property of the database file and is already in effect once any writer set it).
+    """
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma, value in PROFILES[profile].items():
+            if read_only and pragma == 'journal_mode':
+                continue
+            cursor.execute(f"PRAGMA {pragma} = {value}")
+    finally:
+        cursor.close()
+
+
+def build_engine(url=DATABASE_URL, profile=DATABASE_PROFILE, read_only=False, pool_size=5, shared=False):
+    """Engine for a database URL with the profile's PRAGMAs set on every connection
+
+    An in-memory database lives only as long as its connection, so every session shares
+    one connection and the tables are created straight away. A read_only engine opens
+    the SQLite file with mode=ro and keeps up to pool_size connections. A shared engine
+    uses one connection for everything, like an in-memory one (snapshot.py needs its
+    writes and its data_version checks on the same connection).
+    """
+    if is_memory(url) or shared:
+        engine = create_engine(url, poolclass=StaticPool, connect_args={'check_same_thread': False})
+    elif read_only:
+        path = sqlite_path(url)
+        if path is None:
+            raise ValueError(f"Read-only connections need an SQLite database file, not {url!r}")
+        engine = create_engine(f"sqlite:///file:{path}?mode=ro&uri=true", pool_size=pool_size, max_overflow=0)
+    else:
+        engine = create_engine(url)
+    if engine.dialect.name == 'sqlite':
+        event.listen(engine, 'connect',
+                     lambda dbapi_connection, record: apply_profile(dbapi_connection, profile, read_only))
+    if is_memory(url):
+        Base.metadata.create_all(engine)
+    return engine
+
+
+def get_engine():
+    """The shared engine, created on first use so importing models stays cheap"""
+    global _engine
+    if _engine is None:
+        _engine = build_engine()
+    return _engine
+
+
+def use_engine(engine):
+    """Makes `engine` the shared engine (e.g. a read-only pool); call before the session is first used"""
+    global _engine
+    _engine = engine
+
+
+def is_read(clause):
+    """True for a SELECT statement (Core, ORM or text) that may be answered from the read engine"""
+    if isinstance(clause, TextClause):
+        return clause.text.lstrip()[:6].upper() == 'SELECT'
+    return isinstance(clause, (Select, CompoundSelect))
+
+
+def use_read_engine(engine):
+    """Sends plain reads to `engine` (None sends everything to the shared engine again)"""
+    global _read_engine
+    _read_engine = engine
+
+
+class RoutingSession(BaseSession):
+    """Session that answers reads from the read engine when one is installed
+
+    Flushes, writes, DDL and anything else go to the shared engine, as do reads made
+    while flushing.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if _read_engine is not None and not self._flushing and is_read(clause):
+            return _read_engine
+        return super().get_bind(mapper=mapper, clause=clause, **kw)
+
+
+Session = sessionmaker(class_=RoutingSession)
+
+# Proxy to a per-thread Session, created (and bound to the engine) on first use
+session = scoped_session(lambda: Session(bind=get_engine()))
+
+
+def __getattr__(name):
+    # Keeps `from models import engine` working without creating the engine at import time
+    if name == 'engine':
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Association table for many-to-many relationship between students and courses
 enrollments = Table(
@@ -14,10 +112,13 @@ enrollments = Table(
     Base.metadata,
     Column('student_id', Integer, ForeignKey('students.id'), primary_key=True),
     Column('course_id', Integer, ForeignKey('courses.id'), primary_key=True),
-    Column('enrollment_date', DateTime, default=datetime.now)
+    Column('enrollment_date', DateTime, default=datetime.now),
+    # The primary key covers lookups by student; this covers Course.students
+    Index('ix_enrollments_course_student', 'course_id', 'student_id')
 )
 
 # Import models to register them with Base
 from .student import Student
 from .course import Course
 from .grade import Grade
+from .gpa_summary import GpaSummary
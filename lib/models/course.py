@@ -1,6 +1,6 @@
 from sqlalchemy import Column, Integer, String
 from sqlalchemy.orm import relationship
-from . import Base
+from . import Base, enrollments
 
 class Course(Base):
     __tablename__ = 'courses'
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey, Index
+from sqlalchemy.orm import relationship
+from datetime import datetime
+from . import Base
+
+class GpaSummary(Base):
+    __tablename__ = 'gpa_summaries'
+
+    # Running per-student totals, kept in step with the grades table by gpa.py
+    student_id = Column(Integer, ForeignKey('students.id'), primary_key=True)
+    quality_points = Column(Float, nullable=False, default=0.0)  # sum of grade points * credits
+    credits = Column(Integer, nullable=False, default=0)         # sum of credits attempted
+    gpa = Column(Float, nullable=False, default=0.0)
+    standing = Column(String, nullable=False)                    # e.g., "Good Standing"
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+
+    # Relationships
+    student = relationship("Student", back_populates="gpa_summary")
+
+    # Class standings walk students in GPA order (rank windows and top-N without a sort)
+    __table_args__ = (
+        Index('ix_gpa_summaries_gpa', 'gpa'),
+    )
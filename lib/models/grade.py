@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from . import Base
@@ -15,4 +15,13 @@ class Grade(Base):
 
     # Relationships
     student = relationship("Student", back_populates="grades")
-    course = relationship("Course", back_populates="grades")
\ No newline at end of file
+    course = relationship("Course", back_populates="grades")
+
+    # Secondary indexes for the report queries (student lookups are covered by the first)
+    __table_args__ = (
+        Index('ix_grades_student_course_score', 'student_id', 'course_id', 'score'),
+        Index('ix_grades_course_id', 'course_id'),
+        # Course statistics read each course's scores in order (median and rank windows)
+        Index('ix_grades_course_score', 'course_id', 'score'),
+        Index('ix_grades_date_recorded', 'date_recorded'),
+    )
\ No newline at end of file
@@ -1,7 +1,7 @@
 from sqlalchemy import Column, Integer, String, DateTime
 from sqlalchemy.orm import relationship
 from datetime import datetime
-from . import Base
+from . import Base, enrollments
 
 class Student(Base):
     __tablename__ = 'students'
@@ -14,4 +14,5 @@ class Student(Base):
 
     # Relationships
     grades = relationship("Grade", back_populates="student", cascade="all, delete-orphan")
-    courses = relationship("Course", secondary=enrollments, back_populates="students")
\ No newline at end of file
+    courses = relationship("Course", secondary=enrollments, back_populates="students")
+    gpa_summary = relationship("GpaSummary", back_populates="student", uselist=False, cascade="all, delete-orphan")
\ No newline at end of file
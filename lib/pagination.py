@@ -0,0 +1,77 @@
+# lib/pagination.py
+
+from rows import fetch_all
+from report_cache import cached
+
+# Rows shown per page on listing screens
+PAGE_SIZE = 20
+
+
+def fetch_page(statement, key_column, after=None, before=None, page_size=PAGE_SIZE):
+    """Up to page_size + 1 rows ordered by key_column, starting after (or ending before) a key
+
+    The extra row only tells the caller whether another page exists in that direction.
+    """
+    if before is not None:
+        rows = fetch_all(statement.where(key_column < before).order_by(key_column.desc()).limit(page_size + 1))
+        return rows[::-1]
+    if after is not None:
+        statement = statement.where(key_column > after)
+    return fetch_all(statement.order_by(key_column).limit(page_size + 1))
+
+
+def browse(statement, key_column, render, header=None, page_size=PAGE_SIZE, cache=None):
+    """Prints rows a page at a time with next/previous navigation; returns False if there are none
+
+    Rows must carry the key_column value first. Each page is its own indexed range query,
+    so memory use and latency don't depend on how far into the table the user pages.
+    With cache=(key, tags), pages are kept in the report cache until one of the tags changes.
+    """
+    def load_page(after=None, before=None):
+        if cache is None:
+            return fetch_page(statement, key_column, after, before, page_size)
+        key, tags = cache
+        return cached((*key, after, before, page_size), tags,
+                      lambda: fetch_page(statement, key_column, after, before, page_size))
+
+    rows = load_page()
+    if not rows:
+        return False
+
+    page = 1
+    has_next = len(rows) > page_size
+    rows = rows[:page_size]
+    while True:
+        if header:
+            header()
+        for row in rows:
+            render(row)
+        if page == 1 and not has_next:
+            return True
+
+        options = []
+        if has_next:
+            options.append("[n]ext")
+        if page > 1:
+            options.append("[p]rev")
+        options.append("[q]uit")
+        prompt = f"-- page {page} -- {', '.join(options)}: "
+
+        while True:
+            choice = input(prompt).strip().lower()
+            if choice == 'n' and has_next:
+                rows = load_page(after=rows[-1][0])
+                has_next = len(rows) > page_size
+                rows = rows[:page_size]
+                page += 1
+                break
+            elif choice == 'p' and page > 1:
+                rows = load_page(before=rows[0][0])
+                rows = rows[-page_size:]
+                has_next = True
+                page -= 1
+                break
+            elif choice == 'q':
+                return True
+            else:
+                print("Invalid choice")
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# lib/query_plans.py
+
+import re
+import sys
+from sqlalchemy import select, text
+from models import session, Base, Student, Course, Grade, GpaSummary, enrollments
+from gpa import gpa_totals
+from course_stats import course_stats_statement, student_ranks_statement
+from standings import ranked_statement
+from lookups import is_enrolled_statement
+from transcripts import range_statement
+
+# A plan step that reads a whole table or index, e.g. "SCAN grades"
+FULL_SCAN = re.compile(r'^SCAN (\w+)')
+
+
+def helper_queries():
+    """(label, statement, tables allowed a full scan) for every query the helpers run per lookup"""
+    return [
+        ("student by id", select(Student).where(Student.id == 1), ()),
+        ("course by code", select(Course).where(Course.code == 'CS101'), ()),
+        ("student GPA totals (gpa.gpa_totals)", gpa_totals().where(Student.id == 1), ()),
+        ("cached GPA (gpa.cached_gpa)", select(GpaSummary.gpa).where(GpaSummary.student_id == 1), ()),
+        ("all students GPAs", select(Student.id, GpaSummary.gpa)
+            .outerjoin(GpaSummary, GpaSummary.student_id == Student.id).order_by(Student.id), ('students',)),
+        ("student report grades", select(Course.code, Course.name, Grade.score)
+            .join(Grade, Grade.course_id == Course.id).where(Grade.student_id == 1), ()),
+        ("course grade report", select(Grade.score, Student.first_name, Student.last_name)
+            .join(Student, Student.id == Grade.student_id).where(Grade.course_id == 1), ()),
+        ("course enrollment (Course.students)", select(Student)
+            .join(enrollments, enrollments.c.student_id == Student.id).where(enrollments.c.course_id == 1), ()),
+        ("student courses (Student.courses)", select(Course)
+            .join(enrollments, enrollments.c.course_id == Course.id).where(enrollments.c.student_id == 1), ()),
+        ("student grades (Student.grades)", select(Grade).where(Grade.student_id == 1), ()),
+        ("course statistics", course_stats_statement(1), ()),
+        ("course student ranking", student_ranks_statement(1)[0], ()),
+        # Walks ix_gpa_summaries_gpa in order and stops after N rows; the cohort count reads the same index
+        ("class standings top-N", ranked_statement().limit(10), ('gpa_summaries',)),
+        ("class standings for a course", ranked_statement(course_id=1).limit(10), ()),
+        ("enrollment check (lookups.is_enrolled)", is_enrolled_statement(1, 1), ()),
+        ("course roster (roster.enrolled_ids)", select(enrollments.c.student_id).where(enrollments.c.course_id == 1), ()),
+        ("grades recorded since", select(Grade.id).where(Grade.date_recorded >= '2024-01-01'), ()),
+        ("transcript range (transcripts.range_statement)", range_statement(1, 1000), ()),
+    ]
+
+
+def explain(statement):
+    """EXPLAIN QUERY PLAN detail lines for a statement"""
+    sql = str(statement.compile(session.get_bind(), compile_kwargs={'literal_binds': True}))
+    return [row[-1] for row in session.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+
+
+def check_query_plans(verbose=True):
+    """Explains every helper query; returns the labels that fall back to a full table scan"""
+    failures = []
+    for label, statement, allowed_scans in helper_queries():
+        plan = explain(statement)
+        scans = [match.group(1) for match in map(FULL_SCAN.match, plan) if match]
+        # Scans of subqueries (anon_1, (subquery-2)) only read rows an indexed step already produced
+        bad = [table for table in scans if table in Base.metadata.tables and table not in allowed_scans]
+        if bad:
+            failures.append(label)
+        if verbose:
+            print(f"{'FAIL' if bad else 'ok'.ljust(4)} {label}")
+            for detail in plan:
+                print(f"       {detail}")
+    return failures
+
+
+if __name__ == "__main__":
+    failures = check_query_plans()
+    if failures:
+        print(f"\n{len(failures)} helper queries scan a whole table: {', '.join(failures)}")
+        sys.exit(1)
+    print("\nAll helper queries use an index.")
@@ -0,0 +1,175 @@
+# lib/report_cache.py
+#
+# Result cache for reports that are opened again and again while nothing changes. Each entry is
+# stored under its report name and parameters together with the versions of the tags it depends
+# on, e.g. ('student', 5) or ('gpa',). The write helpers bump the tags they touch once their
+# commit is done, so a new grade only invalidates that student's report, that course's pages
+# and the all-GPAs list. Changes made elsewhere can't be traced to tags: when PRAGMA
+# data_version moves on the session's connection, the whole cache is dropped (along with any
+# other caches registered with on_external_change, such as the lookup caches). SQLite moves it
+# only for commits made by other connections, so our own writes never hide someone else's;
+# writes from the write queue's thread count as outside changes. Entries are evicted least
+# recently used first to stay within a byte budget.
+
+import sys
+import threading
+from collections import OrderedDict
+from models import session
+
+REPORT_CACHE_BYTES = 64 * 1024 * 1024
+
+_lock = threading.Lock()
+_entries = OrderedDict()    # key -> (tag versions, value, size)
+_versions = {}              # tag -> change count
+_size = 0
+_listeners = []             # called when another process has committed
+hits = 0
+misses = 0
+
+
+def value_size(value):
+    """Approximate bytes held by a cached report (text, or a list of rows)"""
+    return len(value) if isinstance(value, str) else len(repr(value))
+
+
+def data_version():
+    """(connection info, PRAGMA data_version) for the session's connection to the database file
+
+    The version is per connection and only moves when another connection commits; info
+    stays with the pooled connection, so it keeps the last version seen on it.
+    """
+    connection = session.connection()
+    return connection.info, connection.exec_driver_sql("PRAGMA data_version").scalar()
+
+
+def clear():
+    """Drops every entry (their tags no longer say anything about what changed)"""
+    global _size
+    with _lock:
+        _entries.clear()
+        _size = 0
+
+
+def on_external_change(listener):
+    """Calls listener() (e.g. to clear another cache) whenever another process's commit is noticed"""
+    _listeners.append(listener)
+
+
+def check_external_changes():
+    """Clears the cache (and registered caches) if another connection has committed since we last looked
+
+    A connection not seen before can't tell what it missed, so it clears them too.
+    """
+    info, version = data_version()
+    if info.get('report_cache_version') != version:
+        clear()
+        for listener in _listeners:
+            listener()
+        info['report_cache_version'] = version
+
+
+def changed(*tags):
+    """Invalidates entries depending on any of `tags`; call after committing a write"""
+    with _lock:
+        for tag in tags:
+            _versions[tag] = _versions.get(tag, 0) + 1
+
+
+def changed_everything():
+    """Drops every entry after a write that touches all reports (e.g. a GPA cache rebuild)"""
+    clear()
+
+
+def lookup(key, tags):
+    """(tag versions, cached value or None) for `key`; counts the hit or miss"""
+    global hits, misses
+    check_external_changes()
+    with _lock:
+        versions = tuple(_versions.get(tag, 0) for tag in tags)
+        entry = _entries.get(key)
+        if entry is not None and entry[0] == versions:
+            _entries.move_to_end(key)
+            hits += 1
+            return versions, entry[1]
+        misses += 1
+        return versions, None
+
+
+def store(key, versions, value, budget=REPORT_CACHE_BYTES):
+    """Keeps `value` under `key` (if it fits), evicting the least recently used entries
+
+    `versions` are the tag versions read before the value was computed; a write committed
+    meanwhile has already bumped them past these, so the entry is simply never hit.
+    """
+    global _size
+    size = value_size(value)
+    with _lock:
+        old = _entries.pop(key, None)
+        if old is not None:
+            _size -= old[2]
+        if size <= budget:
+            _entries[key] = (versions, value, size)
+            _size += size
+            while _size > budget:
+                _, (_, _, evicted) = _entries.popitem(last=False)
+                _size -= evicted
+
+
+def cached(key, tags, compute, budget=REPORT_CACHE_BYTES):
+    """compute()'s result for `key`, reused until one of `tags` changes"""
+    versions, value = lookup(key, tags)
+    if value is None:
+        value = compute()
+        store(key, versions, value, budget)
+    return value
+
+
+class Tee:
+    """Text stream that writes through to `out` and keeps a copy until it grows past `limit` characters"""
+
+    def __init__(self, out, limit):
+        self.out = out
+        self.limit = limit
+        self.parts = []
+        self.size = 0
+
+    def write(self, text):
+        self.out.write(text)
+        self.size += len(text)
+        if self.parts is not None:
+            if self.size <= self.limit:
+                self.parts.append(text)
+            else:
+                self.parts = None   # too big to keep; stop copying
+        return len(text)
+
+    def flush(self):
+        self.out.flush()
+
+    def text(self):
+        """Everything written, or None once it outgrew the limit"""
+        return None if self.parts is None else ''.join(self.parts)
+
+
+def printed(key, tags, write, out=None, budget=REPORT_CACHE_BYTES):
+    """Prints write(out=...)'s report for `key`; returns the number of characters printed
+
+    A cached copy is printed while none of `tags` has changed. Otherwise the report streams
+    straight to `out` as it's written, and is kept for next time only if it fits in budget.
+    """
+    out = out or sys.stdout
+    versions, text = lookup(key, tags)
+    if text is not None:
+        out.write(text)
+        return len(text)
+    tee = Tee(out, budget)
+    write(out=tee)
+    text = tee.text()
+    if text is not None:
+        store(key, versions, text, budget)
+    return tee.size
+
+
+def cache_stats():
+    """(entries, approximate bytes, hits, misses)"""
+    return len(_entries), _size, hits, misses
@@ -0,0 +1,284 @@
+# lib/report_server.py
+#
+# Serves the read-only reports (View Reports and Calculate GPAs) as JSON over local HTTP, so
+# staff share one process and one pool of database connections instead of each running a CLI.
+#
+#   python lib/report_server.py --port 8765 --threads 8 --processes 4
+#   curl http://127.0.0.1:8765/students/5/report
+#
+# An asyncio loop accepts connections and parses requests; the queries run on a thread pool,
+# each thread with its own session over a pool of read-only SQLite connections. SQLite releases
+# the GIL while it executes a statement, but building rows is Python work, so --processes starts
+# several servers on the same port (SO_REUSEPORT) to use more than one core.
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, unquote, urlsplit
+from sqlalchemy import func, select
+from models import session, build_engine, use_engine, Student, Course, Grade, GpaSummary
+from settings import DATABASE_URL, sqlite_path
+from pagination import fetch_page
+from rows import fetch_all, fetch_first
+from gpa import cached_summary, academic_standing, find_gpa_drift
+from helpers import course_grades_statement, format_grade
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+DEFAULT_THREADS = 8
+
+# Rows per page on the listing endpoints (?limit= can ask for fewer, up to MAX_PAGE_SIZE)
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# Drifted GPAs listed by /gpa/drift (the count covers all of them)
+DRIFT_SAMPLE = 20
+
+STATUS_TEXT = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 500: 'Internal Server Error'}
+
+
+class ReportError(Exception):
+    """A request the server can't answer; sent to the client as {"error": message}"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def parse_id(value):
+    try:
+        return int(value)
+    except ValueError:
+        raise ReportError("Invalid ID.")
+
+
+def parse_page(query):
+    """(after key, page size) from ?after=&limit="""
+    after = parse_id(query['after'][0]) if 'after' in query else None
+    limit = parse_id(query['limit'][0]) if 'limit' in query else DEFAULT_PAGE_SIZE
+    return after, max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def page_of(statement, key_column, query, render):
+    """One keyset page as {"rows": [...], "next": key or None}"""
+    after, limit = parse_page(query)
+    rows = fetch_page(statement, key_column, after=after, page_size=limit)
+    next_key = rows[limit - 1][0] if len(rows) > limit else None
+    return {'rows': [render(row) for row in rows[:limit]], 'next': next_key}
+
+
+# Reports (each runs on a worker thread and returns plain data)
+def student_report(query, student_id):
+    """Same content as Student Performance Report"""
+    student_id = parse_id(student_id)
+    student = fetch_first(
+        select(Student.id, Student.first_name, Student.last_name, Student.email, Student.enrollment_date)
+        .where(Student.id == student_id)
+    )
+    if not student:
+        raise ReportError("Student not found.", 404)
+
+    grades = fetch_all(
+        select(Course.code, Course.name, Grade.score)
+        .join(Grade, Grade.course_id == Course.id)
+        .where(Grade.student_id == student_id)
+        .order_by(Grade.id)
+    )
+    summary = cached_summary(student_id)
+    gpa = summary.gpa if summary else 0.0
+    return {
+        'id': student.id,
+        'name': f"{student.first_name} {student.last_name}",
+        'email': student.email,
+        'enrollment_date': student.enrollment_date.strftime('%Y-%m-%d') if student.enrollment_date else None,
+        'grades': [{'course': code, 'name': name, 'score': score, 'grade': format_grade(score)}
+                   for code, name, score in grades],
+        'gpa': round(gpa, 2),
+        'standing': summary.standing if summary else academic_standing(gpa),
+    }
+
+
+def student_gpa(query, student_id):
+    """Same content as Calculate GPA for Specific Student"""
+    student_id = parse_id(student_id)
+    row = fetch_first(
+        select(Student.first_name, Student.last_name, func.coalesce(GpaSummary.gpa, 0.0))
+        .outerjoin(GpaSummary, GpaSummary.student_id == Student.id)
+        .where(Student.id == student_id)
+    )
+    if not row:
+        raise ReportError("Student not found.", 404)
+    first_name, last_name, gpa = row
+    return {'id': student_id, 'name': f"{first_name} {last_name}", 'gpa': round(gpa, 2)}
+
+
+def all_gpas(query):
+    """Show All Students GPAs, a page at a time"""
+    statement = (
+        select(Student.id, Student.first_name, Student.last_name, func.coalesce(GpaSummary.gpa, 0.0))
+        .outerjoin(GpaSummary, GpaSummary.student_id == Student.id)
+    )
+    return page_of(statement, Student.id, query, lambda row: {
+        'id': row[0], 'name': f"{row[1]} {row[2]}", 'gpa': round(row[3], 2),
+    })
+
+
+def course_grades(query, course_code):
+    """Course Grade Report, a page at a time"""
+    course = fetch_first(select(Course.id, Course.code, Course.name).where(Course.code == course_code.strip().upper()))
+    if not course:
+        raise ReportError("Course not found.", 404)
+
+    result = page_of(course_grades_statement(course.id), Grade.id, query, lambda row: {
+        'student': f"{row[1]} {row[2]}", 'score': row[3], 'grade': format_grade(row[3]), 'assignment': row[4],
+    })
+    return dict(result, course=course.code, name=course.name)
+
+
+def gpa_drift(query):
+    """The check half of Verify/Rebuild GPA Cache (rebuilding writes, so it stays in the CLI)"""
+    drift = find_gpa_drift()
+    return {
+        'stale': len(drift),
+        'sample': [{'id': student_id, 'cached': cached, 'actual': actual}
+                   for student_id, cached, actual in drift[:DRIFT_SAMPLE]],
+    }
+
+
+def health(query):
+    return {'status': 'ok'}
+
+
+ROUTES = [
+    (re.compile(r'/students/([^/]+)/report'), student_report),
+    (re.compile(r'/students/([^/]+)/gpa'), student_gpa),
+    (re.compile(r'/gpa'), all_gpas),
+    (re.compile(r'/gpa/drift'), gpa_drift),
+    (re.compile(r'/courses/([^/]+)/grades'), course_grades),
+    (re.compile(r'/health'), health),
+]
+
+
+def handle(path):
+    """(status, JSON-able body) for a GET path; runs on a worker thread"""
+    url = urlsplit(path)
+    query = parse_qs(url.query)
+    try:
+        for pattern, report in ROUTES:
+            match = pattern.fullmatch(url.path.rstrip('/') or '/')
+            if match:
+                return 200, report(query, *map(unquote, match.groups()))
+        return 404, {'error': "No such report."}
+    except ReportError as e:
+        return e.status, {'error': str(e)}
+    finally:
+        # Ends the read transaction and returns the connection to the pool
+        session.remove()
+
+
+async def respond(writer, status, body, keep_alive):
+    payload = json.dumps(body, default=str).encode()
+    writer.write(
+        f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\n"
+        f"Content-Type: application/json\r\n"
+        f"Content-Length: {len(payload)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + payload
+    )
+    await writer.drain()
+
+
+async def serve_client(reader, writer, executor):
+    """Answers requests on one connection until the client closes it (HTTP/1.1 keep-alive)"""
+    loop = asyncio.get_running_loop()
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line:
+                break
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                headers[name.strip().lower()] = value.strip()
+
+            try:
+                method, path, version = request_line.decode('latin-1').split()
+            except ValueError:
+                await respond(writer, 400, {'error': "Malformed request."}, False)
+                break
+            keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+            if method != 'GET':
+                status, body = 405, {'error': "Reports are read-only; use GET."}
+            else:
+                try:
+                    status, body = await loop.run_in_executor(executor, handle, path)
+                except Exception as e:
+                    status, body = 500, {'error': f"{type(e).__name__}: {e}"}
+            await respond(writer, status, body, keep_alive)
+            if not keep_alive:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(host, port, threads, reuse_port):
+    # Every session in this process reads through a pool of read-only connections, one per thread
+    use_engine(build_engine(read_only=True, pool_size=threads))
+    executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='report')
+    server = await asyncio.start_server(
+        lambda reader, writer: serve_client(reader, writer, executor),
+        host, port, reuse_port=reuse_port or None, backlog=1024,
+    )
+    async with server:
+        await server.serve_forever()
+
+
+def run_server(host, port, threads, reuse_port):
+    try:
+        asyncio.run(serve(host, port, threads, reuse_port))
+    except KeyboardInterrupt:
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve read-only grade reports as JSON over local HTTP")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--threads', type=int, default=DEFAULT_THREADS, help="query threads (and connections) per process")
+    parser.add_argument('--processes', type=int, default=1, help="server processes sharing the port (Linux/BSD)")
+    args = parser.parse_args()
+
+    if sqlite_path(DATABASE_URL) is None:
+        print(f"The report server needs an SQLite database file, not {DATABASE_URL}.")
+        sys.exit(1)
+
+    print(f"Serving reports on http://{args.host}:{args.port} "
+          f"({args.processes} process(es) × {args.threads} threads). Ctrl-C to stop.")
+    if args.processes == 1:
+        run_server(args.host, args.port, args.threads, False)
+        return
+
+    workers = [
+        multiprocessing.Process(target=run_server, args=(args.host, args.port, args.threads, True))
+        for _ in range(args.processes)
+    ]
+    for worker in workers:
+        worker.start()
+    try:
+        for worker in workers:
+            worker.join()
+    except KeyboardInterrupt:
+        for worker in workers:
+            worker.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# lib/roster.py
+#
+# Bulk enrollment and roster sync for one course. The course's current enrollments are read
+# once (a range of ix_enrollments_course_student) and compared with the requested student IDs
+# as sets, so adds and drops cost no per-student queries; they're then applied with one
+# executemany each, in a single transaction.
+
+import csv
+import json
+import sys
+from datetime import datetime
+from sqlalchemy import bindparam, delete, func, insert, select
+from models import session, Student, enrollments
+
+
+def read_student_ids(path):
+    """Student IDs from a file ('-' for stdin): one per line, or a CSV with a student_id column
+
+    Returns (IDs, rejected lines) where rejected lines are (line number, text) pairs.
+    """
+    f = sys.stdin if path == '-' else open(path, newline='')
+    try:
+        lines = list(f)
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+    ids, rejected = [], []
+    header = lines[0].strip().lower().split(',') if lines else []
+    if 'student_id' in header:
+        column = header.index('student_id')
+        rows = ((number, row[column] if len(row) > column else '') for number, row in enumerate(csv.reader(lines[1:]), 2))
+    else:
+        rows = ((number, line) for number, line in enumerate(lines, 1))
+    for line_number, value in rows:
+        value = value.strip()
+        if not value or value.startswith('#'):
+            continue
+        try:
+            ids.append(int(value))
+        except ValueError:
+            rejected.append((line_number, value))
+    return ids, rejected
+
+
+def parse_student_ids(text):
+    """IDs from a comma- or space-separated string; raises ValueError on anything else"""
+    return [int(value) for value in text.replace(',', ' ').split()]
+
+
+def enrolled_ids(course_id):
+    """Set of student IDs currently enrolled in a course"""
+    return set(session.execute(
+        select(enrollments.c.student_id).where(enrollments.c.course_id == course_id)
+    ).scalars())
+
+
+def existing_ids(student_ids):
+    """The subset of student_ids that exist, in one query (the IDs travel as one JSON parameter)"""
+    if not student_ids:
+        return set()
+    requested = func.json_each(json.dumps(sorted(student_ids))).table_valued('value')
+    return set(session.execute(select(Student.id).where(Student.id.in_(select(requested.c.value)))).scalars())
+
+
+def plan_roster(course_id, student_ids, sync=False):
+    """(adds, drops, unknown IDs) that make the course's roster include (or, with sync, equal) student_ids"""
+    requested = set(student_ids)
+    enrolled = enrolled_ids(course_id)
+    adds = requested - enrolled
+    known = existing_ids(adds)
+    drops = enrolled - requested if sync else set()
+    return sorted(known), sorted(drops), sorted(adds - known)
+
+
+def apply_roster(course_id, adds, drops):
+    """Inserts and deletes enrollments in one transaction; recorded grades are kept for dropped students"""
+    try:
+        if adds:
+            session.execute(
+                insert(enrollments).values(course_id=course_id, enrollment_date=datetime.now()),
+                [{'student_id': student_id} for student_id in adds],
+            )
+        if drops:
+            session.execute(
+                delete(enrollments).where(
+                    enrollments.c.course_id == course_id,
+                    enrollments.c.student_id == bindparam('dropped'),
+                ),
+                [{'dropped': student_id} for student_id in drops],
+            )
+        session.commit()
+    except BaseException:
+        session.rollback()
+        raise
@@ -0,0 +1,68 @@
+# lib/rows.py
+#
+# Read layer for reports and listings. They select only the columns they print and run those
+# Core statements on the session's connection instead of through Session.execute, so no ORM
+# result processing or identity-map work happens per row. Each row comes back as a namedtuple
+# (one class per distinct list of column names), readable by position, by unpacking or by
+# attribute like the Row objects it replaces. Reads still go to the snapshot when it's on.
+
+from collections import namedtuple
+from functools import lru_cache
+from models import session
+import snapshot
+
+# Rows fetched per round when streaming
+BATCH_SIZE = 1000
+
+
+@lru_cache(maxsize=None)
+def record_type(names):
+    """namedtuple class for a tuple of column names (names that aren't identifiers become _0, _1...)"""
+    return namedtuple('Record', names, rename=True)
+
+
+def connection_for(statement):
+    """Connection the session reads a statement on (the snapshot's while it's current)"""
+    snapshot.refresh_if_stale()
+    return session.connection(bind_arguments={'clause': statement})
+
+
+def execute(statement, params=None, batch_size=None):
+    """Core result for a statement, on the connection the session picks for it (with batch_size, streamed)"""
+    connection = connection_for(statement)
+    if batch_size:
+        connection = connection.execution_options(yield_per=batch_size)
+    return connection.execute(statement, params)
+
+
+def records(result):
+    """Iterator of typed records over a Core result"""
+    return map(record_type(tuple(result.keys()))._make, result)
+
+
+def iter_rows(statement, params=None, batch_size=BATCH_SIZE):
+    """Streams every row of a statement as a record, batch_size rows at a time"""
+    return records(execute(statement, params, batch_size))
+
+
+def fetch_all(statement, params=None):
+    """List of records for every row of a statement"""
+    return list(records(execute(statement, params)))
+
+
+def fetch_first(statement, params=None):
+    """Record for the first row of a statement, or None"""
+    result = execute(statement, params)
+    row = result.first()
+    return None if row is None else record_type(tuple(result.keys()))._make(row)
+
+
+def fetch_one(statement, params=None):
+    """Record for a statement that returns exactly one row"""
+    result = execute(statement, params)
+    return record_type(tuple(result.keys()))._make(result.one())
+
+
+def fetch_scalar(statement, params=None):
+    """First column of the first row, or None"""
+    return execute(statement, params).scalar()
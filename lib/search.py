@@ -0,0 +1,80 @@
+# lib/search.py
+
+from sqlalchemy import select, text
+from models import session, Student
+from rows import fetch_all
+
+# Default number of results shown by search_student
+SEARCH_LIMIT = 25
+
+# Trigram queries need at least this many characters per term
+MIN_TRIGRAM_TERM = 3
+
+_index_ready = None
+_index_trigram = False
+
+
+def fts5_available():
+    """Whether the SQLite library was compiled with FTS5"""
+    options = session.execute(text("PRAGMA compile_options")).scalars().all()
+    return 'ENABLE_FTS5' in options
+
+
+def search_index_ready():
+    """Whether the students_fts index (migration 0006) can serve searches; checked once per process"""
+    global _index_ready, _index_trigram
+    if _index_ready is None:
+        sql = fts5_available() and session.execute(
+            text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'students_fts'")
+        ).scalar()
+        _index_ready = bool(sql)
+        _index_trigram = _index_ready and 'trigram' in sql
+    return _index_ready
+
+
+def rebuild_search_index():
+    """Re-reads every student into the FTS index"""
+    session.execute(text("INSERT INTO students_fts(students_fts) VALUES ('rebuild')"))
+    session.commit()
+
+
+def _match_expression(terms):
+    """FTS5 MATCH string: every term must appear, as a substring (trigram) or word prefix"""
+    phrases = ['"' + term.replace('"', '""') + '"' for term in terms]
+    if not _index_trigram:
+        phrases = [phrase + '*' for phrase in phrases]
+    return ' '.join(phrases)
+
+
+def like_search(query, limit=SEARCH_LIMIT):
+    """Substring search without an index (used when FTS5 can't serve the query)"""
+    return fetch_all(
+        select(Student.id, Student.first_name, Student.last_name, Student.email)
+        .where(
+            (Student.first_name.ilike(f'%{query}%')) |
+            (Student.last_name.ilike(f'%{query}%')) |
+            (Student.email.ilike(f'%{query}%'))
+        )
+        .order_by(Student.id)
+        .limit(limit)
+    )
+
+
+def search_students(query, limit=SEARCH_LIMIT):
+    """Best-ranked (id, first name, last name, email) rows matching every word of the query"""
+    terms = query.split()
+    if not terms or not search_index_ready():
+        return like_search(query, limit)
+    if _index_trigram and any(len(term) < MIN_TRIGRAM_TERM for term in terms):
+        return like_search(query, limit)
+
+    return fetch_all(
+        text("""
+            SELECT students.id, students.first_name, students.last_name, students.email
+            FROM students_fts JOIN students ON students.id = students_fts.rowid
+            WHERE students_fts MATCH :match
+            ORDER BY students_fts.rank
+            LIMIT :limit
+        """),
+        {'match': _match_expression(terms), 'limit': limit}
+    )
@@ -1,128 +1,198 @@
 #!/usr/bin/env python3
 # lib/seed.py
 
-from faker import Faker
-from models import session, Student, Course, Grade, Base, engine
+import argparse
 import random
-
-fake = Faker()
-
-def create_sample_students():
-    """Adds sample students"""
-    students_data = [
-        ("John", "Smith", "john.smith@university.edu"),
-        ("Emma", "Johnson", "emma.johnson@university.edu"),
-        ("Michael", "Brown", "michael.brown@university.edu"),
-        ("Sarah", "Davis", "sarah.davis@university.edu"),
-        ("David", "Wilson", "david.wilson@university.edu"),
-        ("Lisa", "Garcia", "lisa.garcia@university.edu"),
-        ("James", "Miller", "james.miller@university.edu"),
-        ("Jennifer", "Martinez", "jennifer.martinez@university.edu"),
-        ("Robert", "Anderson", "robert.anderson@university.edu"),
-        ("Maria", "Taylor", "maria.taylor@university.edu")
-    ]
-
-    for first, last, email in students_data:
-        student = Student(first_name=first, last_name=last, email=email)
-        session.add(student)
-
-    session.commit()
-    print("Sample students created.")
-
-
-def create_sample_courses():
-    """Creates common academic courses"""
-    courses_data = [
-        ("CS101", "Introduction to Programming", 3),
-        ("MATH201", "Calculus II", 4),
-        ("ENG102", "Composition", 3),
-        ("HIST101", "World History", 3),
-        ("BIO110", "Biology", 4),
-        ("CHEM120", "Chemistry", 4),
-        ("PHYS150", "Physics", 4),
-        ("ECON200", "Microeconomics", 3)
-    ]
-
-    for code, name, credits in courses_data:
-        course = Course(code=code, name=name, credits=credits)
-        session.add(course)
-
-    session.commit()
-    print("Sample courses created.")
-
-
-def enroll_students_in_courses():
-    """Randomly enrolls students in courses"""
-    students = session.query(Student).all()
-    courses = session.query(Course).all()
-
-    for student in students:
-        # Each student enrolls in 3-5 random courses
-        num_courses = random.randint(3, 5)
-        selected_courses = random.sample(courses, num_courses)
-
-        for course in selected_courses:
-            if course not in student.courses:
-                student.courses.append(course)
-
-    session.commit()
-    print("Students enrolled in courses.")
-
-
-def add_sample_grades():
-    """Generates realistic grade distributions"""
-    students = session.query(Student).all()
-
-    for student in students:
-        for course in student.courses:
-            # Generate 1-3 grades per course
-            num_grades = random.randint(1, 3)
-
+import time
+from itertools import islice
+from sqlalchemy import delete, func, insert, select
+from models import session, Student, Course, Grade, GpaSummary, Base, get_engine, enrollments
+from gpa import rebuild_gpa_cache
+
+# Rows per executemany batch
+DEFAULT_CHUNK_SIZE = 10000
+
+SAMPLE_STUDENTS = [
+    ("John", "Smith", "john.smith@university.edu"),
+    ("Emma", "Johnson", "emma.johnson@university.edu"),
+    ("Michael", "Brown", "michael.brown@university.edu"),
+    ("Sarah", "Davis", "sarah.davis@university.edu"),
+    ("David", "Wilson", "david.wilson@university.edu"),
+    ("Lisa", "Garcia", "lisa.garcia@university.edu"),
+    ("James", "Miller", "james.miller@university.edu"),
+    ("Jennifer", "Martinez", "jennifer.martinez@university.edu"),
+    ("Robert", "Anderson", "robert.anderson@university.edu"),
+    ("Maria", "Taylor", "maria.taylor@university.edu")
+]
+
+SAMPLE_COURSES = [
+    ("CS101", "Introduction to Programming", 3),
+    ("MATH201", "Calculus II", 4),
+    ("ENG102", "Composition", 3),
+    ("HIST101", "World History", 3),
+    ("BIO110", "Biology", 4),
+    ("CHEM120", "Chemistry", 4),
+    ("PHYS150", "Physics", 4),
+    ("ECON200", "Microeconomics", 3)
+]
+
+# Departments used for generated courses beyond the sample list
+DEPARTMENTS = [
+    ("CS", "Computer Science"), ("MATH", "Mathematics"), ("ENG", "English"),
+    ("HIST", "History"), ("BIO", "Biology"), ("CHEM", "Chemistry"),
+    ("PHYS", "Physics"), ("ECON", "Economics"), ("PSY", "Psychology"), ("ART", "Art")
+]
+
+ASSIGNMENT_NAMES = [
+    "Midterm Exam", "Final Exam", "Homework 1", "Homework 2",
+    "Project", "Quiz 1", "Quiz 2", "Lab Report", "Presentation"
+]
+
+
+def bulk_insert(table, rows, chunk_size=DEFAULT_CHUNK_SIZE, **values):
+    """Inserts rows from an iterable with one executemany per chunk; returns the row count
+
+    Extra keyword arguments are SQL expressions applied to every row (e.g. timestamps),
+    which is much cheaper than binding a Python default per row.
+    """
+    stmt = insert(table).values(**values) if values else insert(table)
+    rows = iter(rows)
+    count = 0
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return count
+        session.execute(stmt, chunk)
+        count += len(chunk)
+
+
+def now():
+    """SQL timestamp for generated rows"""
+    return func.datetime('now', 'localtime')
+
+
+def report_rate(label, count, started):
+    """Prints how many rows a phase wrote and how fast"""
+    seconds = time.perf_counter() - started
+    rate = count / seconds if seconds else 0.0
+    print(f"{label}: {count:,} rows in {seconds:.2f}s ({rate:,.0f} rows/s)")
+
+
+def create_sample_students(count, rng, fake, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Adds the sample students, then generated ones up to count"""
+    first_names = [fake.first_name() for _ in range(200)]
+    last_names = [fake.last_name() for _ in range(200)]
+
+    def rows():
+        for student_id in range(1, count + 1):
+            if student_id <= len(SAMPLE_STUDENTS):
+                first, last, email = SAMPLE_STUDENTS[student_id - 1]
+            else:
+                first, last = rng.choice(first_names), rng.choice(last_names)
+                email = f"{first}.{last}{student_id}@university.edu".lower()
+            yield {'id': student_id, 'first_name': first, 'last_name': last, 'email': email}
+
+    started = time.perf_counter()
+    report_rate("Students created", bulk_insert(Student.__table__, rows(), chunk_size, enrollment_date=now()), started)
+
+
+def create_sample_courses(count, rng, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Adds the common academic courses, then generated ones up to count"""
+    def rows():
+        for course_id in range(1, count + 1):
+            if course_id <= len(SAMPLE_COURSES):
+                code, name, credits = SAMPLE_COURSES[course_id - 1]
+            else:
+                # Sample codes are all below 300, so generated codes never collide with them
+                n = course_id - len(SAMPLE_COURSES) - 1
+                prefix, department = DEPARTMENTS[n % len(DEPARTMENTS)]
+                number = 300 + n // len(DEPARTMENTS)
+                code, name, credits = f"{prefix}{number}", f"{department} {number}", rng.choice([3, 4])
+            yield {'id': course_id, 'code': code, 'name': name, 'credits': credits}
+
+    started = time.perf_counter()
+    report_rate("Courses created", bulk_insert(Course.__table__, rows(), chunk_size), started)
+
+
+def enroll_students_in_courses(student_count, course_count, rng, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Randomly enrolls each student in 3-5 distinct courses"""
+    course_ids = range(1, course_count + 1)
+
+    def rows():
+        for student_id in range(1, student_count + 1):
+            num_courses = min(rng.randint(3, 5), course_count)
+            for course_id in rng.sample(course_ids, num_courses):
+                yield {'student_id': student_id, 'course_id': course_id}
+
+    started = time.perf_counter()
+    report_rate("Enrollments created", bulk_insert(enrollments, rows(), chunk_size, enrollment_date=now()), started)
+
+
+def add_sample_grades(rng, grades_per_enrollment=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Generates realistic grade distributions for every enrollment"""
+    pairs = session.execute(
+        select(enrollments.c.student_id, enrollments.c.course_id)
+        .order_by(enrollments.c.student_id, enrollments.c.course_id)
+        .execution_options(yield_per=chunk_size)
+    )
+
+    def rows():
+        for student_id, course_id in pairs:
+            # 1-3 grades per enrollment unless a fixed count was requested
+            num_grades = grades_per_enrollment or rng.randint(1, 3)
             for _ in range(num_grades):
                 # Create a realistic grade distribution (bell curve around 75-85)
-                base_score = random.gauss(80, 15)  # Mean 80, std dev 15
-                score = max(0, min(100, base_score))  # Clamp to 0-100
-
-                assignment_names = [
-                    "Midterm Exam", "Final Exam", "Homework 1", "Homework 2",
-                    "Project", "Quiz 1", "Quiz 2", "Lab Report", "Presentation"
-                ]
+                score = max(0, min(100, rng.gauss(80, 15)))  # Mean 80, std dev 15, clamped to 0-100
+                yield {
+                    'student_id': student_id,
+                    'course_id': course_id,
+                    'score': round(score, 1),
+                    'assignment_name': rng.choice(ASSIGNMENT_NAMES)
+                }
 
-                assignment_name = random.choice(assignment_names)
+    started = time.perf_counter()
+    report_rate("Grades created", bulk_insert(Grade.__table__, rows(), chunk_size, date_recorded=now()), started)
 
-                grade = Grade(
-                    student_id=student.id,
-                    course_id=course.id,
-                    score=round(score, 1),
-                    assignment_name=assignment_name
-                )
-                session.add(grade)
 
-    session.commit()
-    print("Sample grades added.")
-
-
-def seed_database():
+def seed_database(students=len(SAMPLE_STUDENTS), courses=len(SAMPLE_COURSES),
+                  grades_per_enrollment=None, seed=None, chunk_size=DEFAULT_CHUNK_SIZE):
     """Main seeding function"""
     print("Seeding database...")
+    started = time.perf_counter()
+    from faker import Faker  # only needed for generating names; slow to import
+    rng = random.Random(seed)
+    fake = Faker()
+    fake.seed_instance(seed)
 
     # Create tables if they don't exist
-    Base.metadata.create_all(engine)
+    Base.metadata.create_all(get_engine())
 
     # Clear existing data
-    session.query(Grade).delete()
-    session.query(Student).delete()
-    session.query(Course).delete()
+    for table in (GpaSummary.__table__, Grade.__table__, enrollments, Student.__table__, Course.__table__):
+        session.execute(delete(table))
+
+    # Seed data in one transaction
+    create_sample_students(students, rng, fake, chunk_size)
+    create_sample_courses(courses, rng, chunk_size)
+    enroll_students_in_courses(students, courses, rng, chunk_size)
+    add_sample_grades(rng, grades_per_enrollment, chunk_size)
     session.commit()
+    rebuild_gpa_cache()
+
+    print(f"Database seeded successfully in {time.perf_counter() - started:.2f}s!")
+
 
-    # Seed data
-    create_sample_students()
-    create_sample_courses()
-    enroll_students_in_courses()
-    add_sample_grades()
+def main():
+    parser = argparse.ArgumentParser(description="Seed grades.db with sample or synthetic load-test data")
+    parser.add_argument('--students', type=int, default=len(SAMPLE_STUDENTS), help="number of students")
+    parser.add_argument('--courses', type=int, default=len(SAMPLE_COURSES), help="number of courses")
+    parser.add_argument('--grades-per-enrollment', type=int, help="fixed grades per enrollment (default: random 1-3)")
+    parser.add_argument('--seed', type=int, help="random seed for reproducible data")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help="rows per executemany batch")
+    args = parser.parse_args()
 
-    print("Database seeded successfully!")
+    seed_database(args.students, args.courses, args.grades_per_enrollment, args.seed, args.chunk_size)
 
 
 if __name__ == "__main__":
-    seed_database()
\ No newline at end of file
+    main()
@@ -0,0 +1,110 @@
+# lib/settings.py
+#
+# Database settings, kept free of SQLAlchemy imports so one-shot commands can read them cheaply.
+# Values come from the environment first, then the [database] section of the config file:
+#
+#   GRADES_DATABASE_URL=sqlite:////srv/grades/grades.db   (or "memory" for a throwaway database)
+#   GRADES_DB_PROFILE=balanced
+#   GRADES_CONFIG=grades.ini
+#   GRADES_ANALYTICS=numpy                                (analytics engine, [analytics] engine)
+#   GRADES_SNAPSHOT=1                                     (serve reads from memory, [database] snapshot)
+#   GRADES_WRITE_QUEUE=1                                  (group-commit entries, [database] write_queue)
+
+import configparser
+import os
+
+DEFAULT_URL = 'sqlite:///grades.db'
+DEFAULT_PROFILE = 'balanced'
+
+# Shorthand accepted for the URL; every connection then shares one private in-memory database
+MEMORY_URL = 'sqlite://'
+
+CONFIG_PATH = os.environ.get('GRADES_CONFIG', 'grades.ini')
+
+# PRAGMAs applied to every new SQLite connection, in this order
+PROFILES = {
+    # SQLite's own defaults: rollback journal, fsync on every commit, ~2 MB page cache
+    'compat': {},
+    # WAL lets reports read while a grade is being written; NORMAL sync is still crash-safe
+    # in WAL mode (a power cut can lose only the last commits, never corrupt the file)
+    'balanced': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -65536,       # 64 MB (negative values are KiB)
+        'mmap_size': 268435456,     # 256 MB
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,       # ms
+    },
+    # Every commit is fsynced, for machines where losing the last grade entered is not acceptable
+    'durable': {
+        'journal_mode': 'WAL',
+        'synchronous': 'FULL',
+        'cache_size': -16384,
+        'mmap_size': 0,
+        'temp_store': 'DEFAULT',
+        'busy_timeout': 10000,
+    },
+    # Seeding and imports: no fsync at all, so a crash can corrupt the database. Rebuildable data only.
+    'bulk': {
+        'journal_mode': 'WAL',
+        'synchronous': 'OFF',
+        'cache_size': -262144,
+        'mmap_size': 1073741824,
+        'temp_store': 'MEMORY',
+        'busy_timeout': 30000,
+    },
+}
+
+
+def load_settings(environ=os.environ, config_path=CONFIG_PATH):
+    """(database URL, profile name) from the environment, then the config file, then the defaults"""
+    config = configparser.ConfigParser()
+    config.read(config_path)  # a missing file is not an error
+    url = environ.get('GRADES_DATABASE_URL') or config.get('database', 'url', fallback=DEFAULT_URL)
+    profile = environ.get('GRADES_DB_PROFILE') or config.get('database', 'profile', fallback=DEFAULT_PROFILE)
+    if url == 'memory':
+        url = MEMORY_URL
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown database profile {profile!r} (choose from {', '.join(PROFILES)})")
+    return url, profile
+
+
+DATABASE_URL, DATABASE_PROFILE = load_settings()
+
+
+def load_analytics_engine(environ=os.environ, config_path=CONFIG_PATH):
+    """Engine for the analytics reports: 'python' (default) or 'numpy' (needs NumPy installed)"""
+    config = configparser.ConfigParser()
+    config.read(config_path)
+    return environ.get('GRADES_ANALYTICS') or config.get('analytics', 'engine', fallback='python')
+
+
+ANALYTICS_ENGINE = load_analytics_engine()
+
+
+def load_switch(variable, option, environ=os.environ, config_path=CONFIG_PATH):
+    """True if an on/off setting is on in the environment, else in the [database] section"""
+    config = configparser.ConfigParser()
+    config.read(config_path)
+    value = environ.get(variable) or config.get('database', option, fallback='no')
+    return value.strip().lower() in ('1', 'yes', 'true', 'on')
+
+
+# Serve interactive reads from an in-memory snapshot (see snapshot.py)
+SNAPSHOT = load_switch('GRADES_SNAPSHOT', 'snapshot')
+
+# Commit new grades, students and enrollments in groups from a writer thread (see write_queue.py)
+WRITE_QUEUE = load_switch('GRADES_WRITE_QUEUE', 'write_queue')
+
+
+def is_memory(url=DATABASE_URL):
+    """True for SQLite URLs that open an in-memory database"""
+    return url in (MEMORY_URL, 'sqlite:///:memory:') or url.startswith('sqlite:///:memory:?')
+
+
+def sqlite_path(url=DATABASE_URL):
+    """Filesystem path of a file-backed sqlite:/// URL, or None for anything else"""
+    prefix = 'sqlite:///'
+    if not url.startswith(prefix) or url == prefix or is_memory(url):
+        return None
+    return url[len(prefix):]
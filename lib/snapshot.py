@@ -0,0 +1,147 @@
+# lib/snapshot.py
+#
+# Snapshot mode for read-heavy sessions: the database file is copied into an in-memory SQLite
+# database with the backup API and every plain read is answered from it. Writes still go to the
+# file, on one shared connection, and each write statement is replayed on the snapshot as soon
+# as it succeeds, committed or rolled back together with the file's transaction. When another
+# process commits (PRAGMA data_version changes on our connection), the snapshot is copied again;
+# until then, or if a replay fails, reads go back to the file.
+
+import sqlite3
+import time
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import StaticPool
+from models import Session, session, build_engine, use_engine, use_read_engine, is_read
+from settings import DATABASE_URL, sqlite_path
+
+# Statements replayed on the snapshot; everything else (SELECT, PRAGMA, ANALYZE...) isn't
+WRITE_KEYWORDS = ('INSERT', 'UPDATE', 'DELETE', 'REPLACE', 'CREATE', 'DROP', 'ALTER')
+
+_disk = None        # sqlite3 connection behind the shared file engine
+_memory = None      # sqlite3 connection holding the snapshot
+_engine = None      # engine over _memory
+_version = None     # data_version of _disk when the snapshot was last in sync
+_stale = True
+_writing = False    # a file transaction with replayed writes is open
+
+
+def enabled():
+    return _memory is not None
+
+
+def is_write(statement):
+    return statement.lstrip()[:7].upper().startswith(WRITE_KEYWORDS)
+
+
+def data_version():
+    """Changes whenever another connection commits to the database file"""
+    return _disk.execute("PRAGMA data_version").fetchone()[0]
+
+
+def mark_stale():
+    """Sends reads to the file until the snapshot is copied again"""
+    global _stale
+    _stale = True
+    use_read_engine(None)
+
+
+def load():
+    """Copies the database file into the snapshot; returns seconds taken, or None if it has to wait"""
+    global _version, _stale
+    if _memory.in_transaction or _disk.in_transaction:
+        mark_stale()
+        return None
+    started = time.perf_counter()
+    try:
+        version = data_version()
+        _disk.backup(_memory)
+    except sqlite3.Error as e:
+        print(f"Snapshot copy failed ({e}); reading from disk.")
+        mark_stale()
+        return None
+    _version, _stale = version, False
+    use_read_engine(_engine)
+    return time.perf_counter() - started
+
+
+def refresh_if_stale():
+    """Copies the file again if another process committed to it, or a replay fell behind"""
+    if not enabled() or (not _stale and data_version() == _version):
+        return
+    seconds = load()
+    if seconds is not None:
+        # Objects loaded before the copy may hold old values
+        session.expire_all()
+        print(f"Snapshot refreshed in {seconds:.2f}s.")
+
+
+def _replay(conn, cursor, statement, parameters, context, executemany):
+    global _writing
+    if _stale or not is_write(statement):
+        return
+    if not _writing:
+        # Our own commits don't change data_version, so a change means someone else wrote
+        # and the rows (and new IDs) would no longer line up
+        if data_version() != _version:
+            mark_stale()
+            return
+        _writing = True
+    try:
+        if executemany:
+            _memory.executemany(statement, parameters)
+        else:
+            _memory.execute(statement, parameters).fetchall()  # fetch runs RETURNING to completion
+    except sqlite3.Error:
+        mark_stale()
+
+
+def _commit(conn):
+    global _writing
+    if _writing:
+        _memory.commit()
+        _writing = False
+
+
+def _rollback(conn):
+    global _writing
+    if _writing:
+        _memory.rollback()
+        _writing = False
+
+
+def _check_version(orm_execute_state):
+    if is_read(orm_execute_state.statement):
+        refresh_if_stale()
+
+
+def enable():
+    """Loads the snapshot and starts serving reads from it; prints the load time
+
+    Call it at startup or any time later (the current session is replaced). Returns
+    False if the database isn't an SQLite file.
+    """
+    global _disk, _memory, _engine
+    if enabled():
+        return True
+    path = sqlite_path(DATABASE_URL)
+    if path is None:
+        print("Snapshot mode needs an SQLite database file; reading from the database directly.")
+        return False
+
+    disk_engine = build_engine(shared=True)
+    with disk_engine.connect() as connection:
+        _disk = connection.connection.driver_connection
+    _memory = sqlite3.connect(':memory:', check_same_thread=False)
+    _engine = create_engine('sqlite://', creator=lambda: _memory, poolclass=StaticPool)
+
+    session.remove()
+    use_engine(disk_engine)
+    event.listen(disk_engine, 'after_cursor_execute', _replay)
+    event.listen(disk_engine, 'commit', _commit)
+    event.listen(disk_engine, 'rollback', _rollback)
+    event.listen(Session, 'do_orm_execute', _check_version)
+
+    seconds = load()
+    pages = _memory.execute("PRAGMA page_count").fetchone()[0] * _memory.execute("PRAGMA page_size").fetchone()[0]
+    print(f"Snapshot of {path} loaded into memory: {pages / 2**20:.1f} MB in {seconds:.2f}s.")
+    return True
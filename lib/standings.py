@@ -0,0 +1,114 @@
+# lib/standings.py
+#
+# Class rank, percentile and dean's list/probation standing for a cohort: every student with
+# grades, or those enrolled in one course or in one enrollment year. Rank comes from a window
+# over the cached GPAs in ix_gpa_summaries_gpa order, so the GPA is never recomputed per row and
+# a top-N query reads N index entries instead of sorting the cohort.
+
+from datetime import datetime
+from sqlalchemy import and_, case, func, select
+from models import Student, GpaSummary, enrollments
+from gpa import DEANS_LIST_GPA, GOOD_STANDING_GPA
+from rows import fetch_all, fetch_one
+
+# Students listed by the top-N report when no count is given
+DEFAULT_TOP = 10
+
+
+def cohort_filter(statement, course_id=None, year=None):
+    """Restricts a statement over GpaSummary/Student to students in a course and/or enrollment year"""
+    if course_id is not None:
+        statement = statement.join(enrollments, and_(
+            enrollments.c.student_id == GpaSummary.student_id,
+            enrollments.c.course_id == course_id,
+        ))
+    if year is not None:
+        statement = statement.where(
+            Student.enrollment_date >= datetime(year, 1, 1),
+            Student.enrollment_date < datetime(year + 1, 1, 1),
+        )
+    return statement
+
+
+def cohort_size(course_id=None, year=None):
+    """Scalar subquery counting the students (with grades) in a cohort"""
+    statement = select(func.count()).select_from(GpaSummary)
+    if year is not None:
+        statement = statement.join(Student, Student.id == GpaSummary.student_id)
+    return cohort_filter(statement, course_id, year).scalar_subquery()
+
+
+def percentile_of_rank(rank, size):
+    """SQL expression: percent of a group ranked at or below `rank` (ties count as at or below, so the top is 100)
+
+    The one percentile definition the reports use; it matches analytics.percentile_ranks.
+    """
+    return 100.0 - (rank - 1) * 100.0 / size
+
+
+def standing_label(gpa):
+    """SQL expression: Dean's List, Good Standing or Academic Probation"""
+    return case(
+        (gpa >= DEANS_LIST_GPA, "Dean's List"),
+        (gpa >= GOOD_STANDING_GPA, 'Good Standing'),
+        else_='Academic Probation',
+    )
+
+
+def ranked_statement(course_id=None, year=None):
+    """(position, student id, first name, last name, GPA, rank, percentile, standing), best GPA first
+
+    Tied GPAs share a rank. Percentile is the share of the cohort ranked at or below the student
+    (the top student is at 100). `position` breaks ties by student id, so it's unique and stable
+    for keyset paging. Both windows follow the GPA index scan: SQLite evaluates the last window
+    listed first, so numbering comes after rank in the inner select and only needs rows with
+    tied GPAs sorted, and rank() then runs over rows already in GPA order. The outer select only
+    puts position first again.
+    """
+    by_gpa = GpaSummary.gpa.desc()
+    rank = func.rank().over(order_by=by_gpa)
+    numbered = cohort_filter(
+        select(
+            rank.label('rank'),
+            func.row_number().over(order_by=(by_gpa, Student.id)).label('position'),
+            Student.id,
+            Student.first_name,
+            Student.last_name,
+            GpaSummary.gpa,
+            percentile_of_rank(rank, cohort_size(course_id, year)).label('percentile'),
+            standing_label(GpaSummary.gpa).label('standing'),
+        )
+        .join(Student, Student.id == GpaSummary.student_id)
+        .order_by(by_gpa),
+        course_id, year,
+    ).subquery()
+    return select(
+        numbered.c.position, numbered.c.id, numbered.c.first_name, numbered.c.last_name,
+        numbered.c.gpa, numbered.c.rank, numbered.c.percentile, numbered.c.standing,
+    )
+
+
+def top_students(count=DEFAULT_TOP, course_id=None, year=None):
+    """The best `count` students of a cohort; walks the GPA index, so no full sort"""
+    return fetch_all(ranked_statement(course_id, year).limit(count))
+
+
+def standings_page_statement(course_id=None, year=None):
+    """(statement, key column) for paging through a whole cohort's standings with browse()"""
+    ranked = ranked_statement(course_id, year).subquery()
+    return select(ranked), ranked.c.position
+
+
+def cohort_summary(course_id=None, year=None):
+    """(students, dean's list count, probation count, mean GPA) for a cohort in one aggregate"""
+    statement = (
+        select(
+            func.count(),
+            func.coalesce(func.sum(case((GpaSummary.gpa >= DEANS_LIST_GPA, 1), else_=0)), 0),
+            func.coalesce(func.sum(case((GpaSummary.gpa < GOOD_STANDING_GPA, 1), else_=0)), 0),
+            func.coalesce(func.avg(GpaSummary.gpa), 0.0),
+        )
+        .select_from(GpaSummary)
+        .join(Student, Student.id == GpaSummary.student_id)
+    )
+    return fetch_one(cohort_filter(statement, course_id, year))
@@ -0,0 +1,29 @@
+# lib/testing/conftest.py
+#
+# Tests run against a throwaway in-memory database (or, with the database_file fixture, a
+# temporary file), never grades.db.
+
+import os
+import sys
+import pytest
+
+os.environ['GRADES_DATABASE_URL'] = 'memory'
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def database_file(tmp_path):
+    """Points the session at a database file, so other connections (and threads) can commit to it"""
+    from models import Base, session, build_engine, get_engine, use_engine
+    import report_cache
+    path = tmp_path / 'grades.db'
+    engine = build_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    previous = get_engine()
+    session.remove()
+    use_engine(engine)
+    report_cache.clear()
+    yield path
+    session.remove()
+    use_engine(previous)
+    engine.dispose()
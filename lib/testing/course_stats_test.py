@@ -0,0 +1,41 @@
+# lib/testing/course_stats_test.py
+
+import statistics
+from models import session, Course, Grade, Student
+from course_stats import course_stats, student_ranks_statement
+from rows import fetch_all
+
+
+def add_course(code, scores):
+    course = Course(code=code, name=code, credits=3)
+    session.add(course)
+    session.flush()
+    session.add_all(Grade(course_id=course.id, score=score) for score in scores)
+    session.commit()
+    return course.id
+
+
+def test_median_of_even_count_averages_the_two_middle_scores():
+    scores = [60.0, 70.0, 75.0, 80.0, 85.0, 95.0]
+    stats = course_stats(add_course('EVEN101', scores))
+    assert stats.median == statistics.median(scores) == 77.5
+
+
+def test_median_of_odd_count_is_the_middle_score():
+    scores = [55.0, 90.0, 72.5, 64.0, 81.0]
+    stats = course_stats(add_course('ODD101', scores))
+    assert stats.median == 72.5
+
+
+def test_student_percentiles_match_the_standings_definition():
+    course_id = add_course('PCT101', [])
+    session.add_all(Student(first_name='Pct', last_name=str(number), email=f"pct{number}@test.edu") for number in range(4))
+    session.flush()
+    students = session.query(Student).filter(Student.email.like('pct%@test.edu')).order_by(Student.id).all()
+    for student, score in zip(students, [90.0, 80.0, 80.0, 70.0]):
+        session.add(Grade(course_id=course_id, student_id=student.id, score=score))
+    session.commit()
+
+    statement, position = student_ranks_statement(course_id)
+    rows = fetch_all(statement.order_by(position))
+    assert [(row.rank, row.percentile) for row in rows] == [(1, 100.0), (2, 75.0), (2, 75.0), (4, 25.0)]
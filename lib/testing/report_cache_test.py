@@ -0,0 +1,73 @@
+# lib/testing/report_cache_test.py
+
+import sqlite3
+import pytest
+import report_cache
+from models import session, Course
+
+
+def commit_elsewhere(path, code):
+    other = sqlite3.connect(path)
+    other.execute("INSERT INTO courses (code, name, credits) VALUES (?, 'External', 3)", (code,))
+    other.commit()
+    other.close()
+
+
+def counting_report(calls):
+    def compute():
+        calls.append(None)
+        return "report"
+    return compute
+
+
+def test_commit_by_another_process_clears_the_cache(database_file):
+    calls = []
+    report_cache.cached(('report',), (), counting_report(calls))
+    report_cache.cached(('report',), (), counting_report(calls))
+    assert len(calls) == 1
+
+    commit_elsewhere(database_file, 'EXT101')
+    report_cache.cached(('report',), (), counting_report(calls))
+    assert len(calls) == 2
+
+
+def test_commit_by_another_process_isnt_hidden_by_our_own(database_file):
+    calls = []
+    report_cache.cached(('report',), (), counting_report(calls))
+    commit_elsewhere(database_file, 'EXT102')
+    session.add(Course(code='OWN102', name='Own', credits=3))
+    session.commit()
+    report_cache.changed(('course', 'OWN102'))
+
+    report_cache.cached(('report',), (), counting_report(calls))
+    assert len(calls) == 2
+
+
+def test_own_commit_only_invalidates_its_tags(database_file):
+    calls = []
+    report_cache.cached(('report',), (('gpa',),), counting_report(calls))
+    session.add(Course(code='OWN101', name='Own', credits=3))
+    session.commit()
+
+    report_cache.cached(('report',), (('gpa',),), counting_report(calls))
+    assert len(calls) == 1
+    report_cache.changed(('gpa',))
+    report_cache.cached(('report',), (('gpa',),), counting_report(calls))
+    assert len(calls) == 2
+
+
+def test_printed_report_streams_and_is_kept_only_if_it_fits(capsys):
+    report_cache.clear()
+
+    def write(out):
+        for line in ("first\n", "second\n"):
+            out.write(line)
+
+    assert report_cache.printed(('small',), (), write) == 13
+    assert report_cache.printed(('small',), (), lambda out: pytest.fail("not replayed")) == 13
+    assert capsys.readouterr().out == "first\nsecond\n" * 2
+
+    calls = []
+    for _ in range(2):
+        report_cache.printed(('large',), (), lambda out: calls.append(out.write("x" * 100)), budget=50)
+    assert len(calls) == 2
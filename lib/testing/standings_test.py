@@ -0,0 +1,46 @@
+# lib/testing/standings_test.py
+
+from datetime import datetime
+from models import session, Student, GpaSummary
+from pagination import fetch_page
+from standings import standings_page_statement, top_students
+
+# Students are added in this year so other tests' rows stay out of the cohort
+YEAR = 1990
+
+
+def add_students(gpas):
+    ids = []
+    for number, gpa in enumerate(gpas):
+        student = Student(first_name='Test', last_name=str(number), email=f"standings{number}@test.edu",
+                          enrollment_date=datetime(YEAR, 9, 1))
+        student.gpa_summary = GpaSummary(quality_points=gpa * 3, credits=3, gpa=gpa, standing='Good Standing')
+        session.add(student)
+        session.flush()
+        ids.append(student.id)
+    session.commit()
+    return ids
+
+
+def test_keyset_pages_through_tied_gpas_once_each():
+    gpas = [3.0, 3.5, 3.0, 2.0, 3.0, 3.5, 3.0]
+    ids = add_students(gpas)
+    expected = [student_id for _, student_id in sorted(zip(gpas, ids), key=lambda pair: (-pair[0], pair[1]))]
+
+    statement, position = standings_page_statement(year=YEAR)
+    seen, after = [], None
+    while True:
+        rows = fetch_page(statement, position, after=after, page_size=2)
+        seen.extend(row.id for row in rows[:2])
+        if len(rows) <= 2:
+            break
+        after = rows[1].position
+    assert seen == expected
+
+    back = fetch_page(statement, position, before=5, page_size=2)
+    assert [row.id for row in back] == expected[1:4]  # the extra row says a previous page exists
+
+    top = top_students(3, year=YEAR)
+    assert [row.position for row in top] == [1, 2, 3]
+    assert [row.rank for row in top] == [1, 1, 3]
+    assert top[0].percentile == 100.0
@@ -0,0 +1,75 @@
+# lib/testing/write_queue_test.py
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from models import session, Course
+from write_queue import WriteQueue
+
+
+def add_course(code):
+    return lambda: session.add(Course(code=code, name=code, credits=3))
+
+
+def course_codes():
+    session.rollback()  # start a new read so the writer's commits are visible
+    return set(session.scalars(select(Course.code)))
+
+
+def test_entries_arriving_together_share_one_commit(database_file):
+    writer = WriteQueue(group_size=10, group_delay=0.5)
+    futures = [writer.submit(add_course(f"GRP{number}")) for number in range(5)]
+    assert writer.flush()
+    writer.close()
+
+    assert all(future.result() for future in futures)
+    assert (writer.batches, writer.entries, writer.largest) == (1, 5, 5)
+    assert course_codes() == {f"GRP{number}" for number in range(5)}
+
+
+def test_failed_group_is_retried_one_entry_at_a_time(database_file):
+    session.add(Course(code='DUP101', name='Taken', credits=3))
+    session.commit()
+
+    writer = WriteQueue(group_size=10, group_delay=0.5)
+    good, bad, also_good = (writer.submit(add_course(code)) for code in ('NEW101', 'DUP101', 'NEW102'))
+    writer.close()
+
+    assert good.result() and also_good.result()
+    with pytest.raises(IntegrityError):
+        bad.result()
+    assert (writer.batches, writer.failures) == (1, 1)
+    assert course_codes() == {'DUP101', 'NEW101', 'NEW102'}
+
+
+def test_flush_and_close_acknowledge_in_submission_order(database_file):
+    acknowledged = []
+    writer = WriteQueue(group_size=2, group_delay=0.5)
+    assert not writer.flush()
+
+    for code in ('ORD1', 'ORD2', 'ORD3'):
+        writer.submit(add_course(code), lambda future, code=code: acknowledged.append(code))
+    writer.acknowledge(wait=False)
+    assert writer.flush()
+    assert acknowledged == ['ORD1', 'ORD2', 'ORD3']
+
+    writer.submit(add_course('ORD4'), lambda future: acknowledged.append('ORD4'))
+    writer.close()
+    assert acknowledged[-1] == 'ORD4'
+    assert not writer.thread.is_alive()
+    assert 'ORD4' in course_codes()
+
+
+def test_writer_uses_full_sync_on_its_own_connection(database_file):
+    def synchronous():
+        return session.connection().exec_driver_sql("PRAGMA synchronous").scalar()
+
+    profile_setting = synchronous()
+    seen = []
+    writer = WriteQueue()
+    writer.submit(lambda: seen.append(synchronous()))
+    writer.close()
+
+    assert seen == [2]  # FULL
+    session.rollback()
+    assert synchronous() == profile_setting
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# lib/transcripts.py
+#
+# Writes every student's report (the same text as Student Performance Report) to its own file
+# at term end. Student IDs are split into ranges that a process pool works through. Each worker
+# opens its own read-only connection, reads a whole range (students, grades, courses and cached
+# GPAs) with one joined query in student order and renders it one student at a time, so the
+# work is spread over every core with nothing shared but the database file.
+#
+#   python lib/transcripts.py transcripts/ --workers 8
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import groupby
+from sqlalchemy import select
+from models import session, build_engine, get_engine, use_engine, Student, Course, Grade, GpaSummary
+from settings import DATABASE_URL, sqlite_path
+from rows import iter_rows
+from helpers import print_student_report
+
+# Students per task; small enough to keep every worker busy until the end
+CHUNK_SIZE = 1000
+
+
+def transcript_path(directory, student_id):
+    return os.path.join(directory, f"{student_id}.txt")
+
+
+def range_statement(first_id, last_id):
+    """Students in an ID range with their grades (one row of NULLs if none) and cached GPA, in report order"""
+    return (
+        select(
+            Student.id, Student.first_name, Student.last_name, Student.email, Student.enrollment_date,
+            GpaSummary.gpa, GpaSummary.standing, Course.code, Course.name, Grade.score,
+        )
+        .outerjoin(GpaSummary, GpaSummary.student_id == Student.id)
+        .outerjoin(Grade, Grade.student_id == Student.id)
+        .outerjoin(Course, Course.id == Grade.course_id)
+        .where(Student.id.between(first_id, last_id))
+        .order_by(Student.id, Grade.id)
+    )
+
+
+def id_ranges(chunk_size=CHUNK_SIZE):
+    """(first ID, last ID, students) for consecutive runs of chunk_size students"""
+    ids = [student_id for student_id, in iter_rows(select(Student.id).order_by(Student.id))]
+    return [(chunk[0], chunk[-1], len(chunk)) for chunk in (ids[i:i + chunk_size] for i in range(0, len(ids), chunk_size))]
+
+
+def start_worker():
+    """Gives a pool process its own read-only connection (nothing is inherited from the parent)"""
+    use_engine(build_engine(read_only=True, pool_size=1))
+
+
+def write_range(first_id, last_id, directory):
+    """Writes the transcripts of every student in an ID range; returns (students, grades) written"""
+    students = grades = 0
+    try:
+        for _, rows in groupby(iter_rows(range_statement(first_id, last_id)), key=lambda row: row.id):
+            rows = list(rows)
+            student = rows[0]
+            course_grades = [(row.code, row.name, row.score) for row in rows if row.code is not None]
+            summary = student if student.gpa is not None else None
+            with open(transcript_path(directory, student.id), 'w', encoding='utf-8') as out:
+                print_student_report(student, course_grades, summary, out)
+            students += 1
+            grades += len(course_grades)
+    finally:
+        session.remove()
+    return students, grades
+
+
+def write_transcripts(directory, workers=None, chunk_size=CHUNK_SIZE, progress=True):
+    """Writes every student's transcript into directory; returns (students, grades, seconds)"""
+    os.makedirs(directory, exist_ok=True)
+    started = time.perf_counter()
+    ranges = id_ranges(chunk_size)
+    total = sum(count for _, _, count in ranges)
+    # Workers must not inherit the parent's SQLite connections
+    session.remove()
+    get_engine().dispose()
+
+    students = grades = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=start_worker) as pool:
+        tasks = [pool.submit(write_range, first_id, last_id, directory) for first_id, last_id, _ in ranges]
+        for task in as_completed(tasks):
+            done, graded = task.result()
+            students += done
+            grades += graded
+            if progress:
+                elapsed = time.perf_counter() - started
+                print(f"\r{students:,}/{total:,} students ({students * 100 // max(total, 1)}%), "
+                      f"{students / elapsed:,.0f}/s", end='', file=sys.stderr, flush=True)
+    if progress and tasks:
+        print(file=sys.stderr)
+    return students, grades, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write every student's report to its own file, in parallel")
+    parser.add_argument('directory', help="output directory (one <student id>.txt per student)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="worker processes (default: one per core)")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help="students per task")
+    parser.add_argument('--quiet', action='store_true', help="no progress line")
+    args = parser.parse_args()
+
+    if sqlite_path(DATABASE_URL) is None:
+        print(f"Transcript generation needs an SQLite database file, not {DATABASE_URL}.")
+        sys.exit(1)
+
+    students, grades, seconds = write_transcripts(args.directory, args.workers, args.chunk_size, not args.quiet)
+    rate = students / seconds if seconds else 0.0
+    print(f"Wrote {students:,} transcripts ({grades:,} grades) to {args.directory} in {seconds:.2f}s "
+          f"with {args.workers} worker(s): {rate:,.0f} students/s, {grades / seconds if seconds else 0.0:,.0f} grades/s")
+
+
+if __name__ == "__main__":
+    main()
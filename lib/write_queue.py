@@ -0,0 +1,227 @@
+# lib/write_queue.py
+#
+# Optional write-behind queue for high-rate entry (GRADES_WRITE_QUEUE=1). Helpers hand their
+# writes to one writer thread instead of committing each row: the thread gathers whatever
+# arrives within GROUP_DELAY seconds (up to GROUP_SIZE entries) and commits it as one
+# transaction, so a burst of entries pays for one fsync and one write-lock acquisition. Each
+# entry's Future resolves only after its group has committed. The writer has a connection of its
+# own that uses synchronous=FULL whatever the profile says, so that commit has been fsynced (WAL
+# with NORMAL can lose the last commits in a power cut, which would make "saved" a lie), while the
+# pooled connections keep the profile's setting. If a group fails (say, one duplicate email), its
+# entries are retried one commit at a time so only the bad one fails. Acknowledgements run on the
+# submitting thread, in submission order: each entry waits for its own unless a batch is running,
+# in which case they're printed as they become ready and at flush() or close().
+
+import atexit
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from sqlalchemy import event
+from sqlalchemy.pool import StaticPool
+from models import Session, session, build_engine, get_engine
+from settings import WRITE_QUEUE
+
+# Most entries committed together, and the longest an entry waits for others to join it
+GROUP_SIZE = 256
+GROUP_DELAY = 0.02
+
+# Commit and acknowledgement latencies kept for the metrics (the most recent ones)
+LATENCY_SAMPLES = 10000
+
+# Set on the writer's own connection: acknowledged entries must be durable
+DURABLE = "PRAGMA synchronous = FULL"
+
+_STOP = object()
+_queue = None
+_batching = False   # entries don't wait for their own acknowledgement
+
+
+def percentile(ordered, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+class WriteQueue:
+    """Single writer thread that commits submitted work in groups"""
+
+    def __init__(self, group_size=GROUP_SIZE, group_delay=GROUP_DELAY):
+        self.group_size = group_size
+        self.group_delay = group_delay
+        self.pending = queue.Queue()
+        self.acknowledgements = deque()    # (future, callback) in submission order
+        self.batches = 0
+        self.entries = 0
+        self.failures = 0
+        self.largest = 0
+        self.commit_seconds = deque(maxlen=LATENCY_SAMPLES)
+        self.ack_seconds = deque(maxlen=LATENCY_SAMPLES)
+        self.thread = threading.Thread(target=self.run, name='grades-writer', daemon=True)
+        self.thread.start()
+
+    def submit(self, work, acknowledge=None):
+        """Queues `work` (a function that adds rows to `session`); the Future resolves once it's committed
+
+        acknowledge(future) is called by acknowledge() once the future and every earlier
+        entry's have resolved.
+        """
+        future = Future()
+        if acknowledge is not None:
+            self.acknowledgements.append((future, acknowledge))
+        self.pending.put((work, future, time.perf_counter()))
+        return future
+
+    def acknowledge(self, wait=True):
+        """Runs acknowledgement callbacks in submission order (with wait=False, only those already resolved)"""
+        while self.acknowledgements:
+            future, callback = self.acknowledgements[0]
+            if not wait and not future.done():
+                break
+            future.exception()  # waits for the group commit
+            self.acknowledgements.popleft()
+            callback(future)
+
+    def flush(self):
+        """Waits until everything submitted so far is committed (or failed); returns True if anything was waiting"""
+        waiting = self.pending.unfinished_tasks > 0
+        self.pending.join()
+        self.acknowledge()
+        return waiting
+
+    def close(self):
+        """Commits what's left, acknowledges it and stops the writer thread"""
+        self.pending.put(_STOP)
+        self.thread.join()
+        self.acknowledge()
+
+    def connect(self):
+        """Binds this thread's session to a connection of the writer's own, at synchronous=FULL"""
+        engine = build_engine(get_engine().url.render_as_string(hide_password=False), shared=True)
+        event.listen(engine, 'connect', lambda dbapi_connection, record: dbapi_connection.execute(DURABLE))
+        session.registry.set(Session(bind=engine))
+        return engine
+
+    def run(self):
+        engine = self.connect()
+        stopping = False
+        while not stopping:
+            entry = self.pending.get()
+            if entry is _STOP:
+                self.pending.task_done()
+                break
+            group = [entry]
+            deadline = time.perf_counter() + self.group_delay
+            while len(group) < self.group_size:
+                try:
+                    entry = self.pending.get(timeout=max(deadline - time.perf_counter(), 0))
+                except queue.Empty:
+                    break
+                if entry is _STOP:
+                    self.pending.task_done()
+                    stopping = True
+                    break
+                group.append(entry)
+            self.commit(group)
+        session.remove()
+        engine.dispose()
+
+    def commit(self, group):
+        started = time.perf_counter()
+        try:
+            for work, _, _ in group:
+                work()
+            session.commit()
+            errors = [None] * len(group)
+        except Exception:
+            session.rollback()
+            errors = [self.commit_alone(work) for work, _, _ in group]
+        committed = time.perf_counter()
+
+        self.batches += 1
+        self.entries += len(group)
+        self.largest = max(self.largest, len(group))
+        self.commit_seconds.append(committed - started)
+        for (_, future, submitted), error in zip(group, errors):
+            self.ack_seconds.append(committed - submitted)
+            if error is None:
+                future.set_result(True)
+            else:
+                self.failures += 1
+                future.set_exception(error)
+            self.pending.task_done()
+
+    def commit_alone(self, work):
+        """Runs and commits one entry; returns the exception it raised, if any"""
+        try:
+            work()
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            return e
+        return None
+
+    def metrics(self):
+        """Entries, group commits, group sizes and latencies (ms) so far"""
+        commits = sorted(self.commit_seconds)
+        acks = sorted(self.ack_seconds)
+        return {
+            'entries': self.entries,
+            'failures': self.failures,
+            'commits': self.batches,
+            'mean_group': self.entries / self.batches if self.batches else 0.0,
+            'largest_group': self.largest,
+            'commit_p50_ms': percentile(commits, 0.50) * 1000 if commits else 0.0,
+            'commit_p95_ms': percentile(commits, 0.95) * 1000 if commits else 0.0,
+            'saved_p50_ms': percentile(acks, 0.50) * 1000 if acks else 0.0,
+            'saved_p95_ms': percentile(acks, 0.95) * 1000 if acks else 0.0,
+        }
+
+    def print_metrics(self):
+        m = self.metrics()
+        print(f"Write queue: {m['entries']} entries ({m['failures']} failed) in {m['commits']} group commits, "
+              f"{m['mean_group']:.1f} per commit on average (largest {m['largest_group']})")
+        print(f"  commit p50 {m['commit_p50_ms']:.1f} ms, p95 {m['commit_p95_ms']:.1f} ms; "
+              f"saved p50 {m['saved_p50_ms']:.1f} ms, p95 {m['saved_p95_ms']:.1f} ms after entry")
+
+
+def get_queue():
+    """The running write queue, started on first use; None when it's off
+
+    It stays off for single-connection engines (in-memory databases and snapshot mode),
+    where a writer thread would share the interactive session's connection.
+    """
+    global _queue
+    if _queue is None and WRITE_QUEUE and not isinstance(get_engine().pool, StaticPool):
+        _queue = WriteQueue()
+        atexit.register(close)
+    return _queue
+
+
+def batching():
+    """True while a batch runs, so entries return before they're saved"""
+    return _batching
+
+
+def start_batch():
+    """Lets entries return without waiting for their group commit until close()"""
+    global _batching
+    _batching = True
+
+
+def flush():
+    """Waits for queued writes to commit and acknowledges them; returns True if any were waiting"""
+    return _queue is not None and _queue.flush()
+
+
+def close():
+    """Commits queued writes, stops the writer and prints its metrics; returns how many entries failed"""
+    global _queue, _batching
+    _batching = False
+    if _queue is None:
+        return 0
+    writer, _queue = _queue, None
+    writer.close()
+    if writer.entries:
+        writer.print_metrics()
+    return writer.failures
@@ -0,0 +1,67 @@
+"""Initial schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Databases created by seed.py (create_all) already have these tables
+    existing = sa.inspect(op.get_bind()).get_table_names()
+
+    if 'students' not in existing:
+        op.create_table(
+            'students',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('first_name', sa.String(), nullable=False),
+            sa.Column('last_name', sa.String(), nullable=False),
+            sa.Column('email', sa.String(), nullable=False, unique=True),
+            sa.Column('enrollment_date', sa.DateTime()),
+        )
+    if 'courses' not in existing:
+        op.create_table(
+            'courses',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('code', sa.String(), nullable=False, unique=True),
+            sa.Column('name', sa.String(), nullable=False),
+            sa.Column('credits', sa.Integer()),
+        )
+    if 'enrollments' not in existing:
+        op.create_table(
+            'enrollments',
+            sa.Column('student_id', sa.Integer(), sa.ForeignKey('students.id'), primary_key=True),
+            sa.Column('course_id', sa.Integer(), sa.ForeignKey('courses.id'), primary_key=True),
+            sa.Column('enrollment_date', sa.DateTime()),
+        )
+    if 'grades' not in existing:
+        op.create_table(
+            'grades',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('student_id', sa.Integer(), sa.ForeignKey('students.id')),
+            sa.Column('course_id', sa.Integer(), sa.ForeignKey('courses.id')),
+            sa.Column('score', sa.Float(), nullable=False),
+            sa.Column('assignment_name', sa.String()),
+            sa.Column('date_recorded', sa.DateTime()),
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('grades')
+    op.drop_table('enrollments')
+    op.drop_table('courses')
+    op.drop_table('students')
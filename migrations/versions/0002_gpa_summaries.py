@@ -0,0 +1,59 @@
+"""Add gpa_summaries cache table
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 09:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, Sequence[str], None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if 'gpa_summaries' in sa.inspect(op.get_bind()).get_table_names():
+        return
+    op.create_table(
+        'gpa_summaries',
+        sa.Column('student_id', sa.Integer(), sa.ForeignKey('students.id'), primary_key=True),
+        sa.Column('quality_points', sa.Float(), nullable=False),
+        sa.Column('credits', sa.Integer(), nullable=False),
+        sa.Column('gpa', sa.Float(), nullable=False),
+        sa.Column('standing', sa.String(), nullable=False),
+        sa.Column('updated_at', sa.DateTime()),
+    )
+    # Populate from the grades already recorded (same rules as gpa.rebuild_gpa_cache)
+    op.execute("""
+        INSERT INTO gpa_summaries (student_id, quality_points, credits, gpa, standing, updated_at)
+        SELECT student_id, quality_points, credits,
+               CASE WHEN credits > 0 THEN quality_points / credits ELSE 0.0 END,
+               CASE WHEN credits > 0 AND quality_points / credits >= 2.0
+                    THEN 'Good Standing' ELSE 'Academic Probation' END,
+               datetime('now', 'localtime')
+        FROM (
+            SELECT grades.student_id AS student_id,
+                   COALESCE(SUM(CASE WHEN grades.score >= 90 THEN 4.0
+                                     WHEN grades.score >= 80 THEN 3.0
+                                     WHEN grades.score >= 70 THEN 2.0
+                                     WHEN grades.score >= 60 THEN 1.0
+                                     ELSE 0.0 END * courses.credits), 0.0) AS quality_points,
+                   COALESCE(SUM(courses.credits), 0) AS credits
+            FROM grades LEFT OUTER JOIN courses ON courses.id = grades.course_id
+            WHERE grades.student_id IN (SELECT id FROM students)
+            GROUP BY grades.student_id
+        )
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('gpa_summaries')
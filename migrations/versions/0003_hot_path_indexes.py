@@ -0,0 +1,36 @@
+"""Add indexes for the report query paths
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 09:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, Sequence[str], None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_grades_student_course_score', 'grades', ['student_id', 'course_id', 'score'], if_not_exists=True)
+    op.create_index('ix_grades_course_id', 'grades', ['course_id'], if_not_exists=True)
+    op.create_index('ix_grades_date_recorded', 'grades', ['date_recorded'], if_not_exists=True)
+    op.create_index('ix_enrollments_course_student', 'enrollments', ['course_id', 'student_id'], if_not_exists=True)
+    # Refresh planner statistics so the new indexes are picked up straight away
+    op.execute('ANALYZE')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_enrollments_course_student', table_name='enrollments')
+    op.drop_index('ix_grades_date_recorded', table_name='grades')
+    op.drop_index('ix_grades_course_id', table_name='grades')
+    op.drop_index('ix_grades_student_course_score', table_name='grades')
@@ -0,0 +1,29 @@
+"""Add a GPA index for class standings
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 15:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, Sequence[str], None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_gpa_summaries_gpa', 'gpa_summaries', ['gpa'], if_not_exists=True)
+    op.execute('ANALYZE')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_gpa_summaries_gpa', table_name='gpa_summaries')
@@ -0,0 +1,68 @@
+"""Add the students_fts full-text index for student search
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 18:40:00.000000
+
+"""
+import sqlite3
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, Sequence[str], None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    # Without FTS5 compiled in there is nothing to create; search keeps using ILIKE
+    if 'ENABLE_FTS5' not in bind.exec_driver_sql('PRAGMA compile_options').scalars().all():
+        return
+    if 'students_fts' in sa.inspect(bind).get_table_names():
+        return
+    # The trigram tokenizer (substring matching) needs SQLite 3.34+; older builds get word prefixes
+    tokenize = 'trigram' if sqlite3.sqlite_version_info >= (3, 34, 0) else 'unicode61'
+    op.execute(f"""
+        CREATE VIRTUAL TABLE students_fts USING fts5(
+            first_name, last_name, email,
+            content='students', content_rowid='id', tokenize='{tokenize}'
+        )
+    """)
+    # External-content FTS tables are kept in sync by triggers on the base table
+    op.execute("""
+        CREATE TRIGGER students_fts_ai AFTER INSERT ON students BEGIN
+            INSERT INTO students_fts(rowid, first_name, last_name, email)
+            VALUES (new.id, new.first_name, new.last_name, new.email);
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER students_fts_ad AFTER DELETE ON students BEGIN
+            INSERT INTO students_fts(students_fts, rowid, first_name, last_name, email)
+            VALUES ('delete', old.id, old.first_name, old.last_name, old.email);
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER students_fts_au AFTER UPDATE ON students BEGIN
+            INSERT INTO students_fts(students_fts, rowid, first_name, last_name, email)
+            VALUES ('delete', old.id, old.first_name, old.last_name, old.email);
+            INSERT INTO students_fts(rowid, first_name, last_name, email)
+            VALUES (new.id, new.first_name, new.last_name, new.email);
+        END
+    """)
+    # Index the students already recorded
+    op.execute("INSERT INTO students_fts(students_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute('DROP TRIGGER IF EXISTS students_fts_au')
+    op.execute('DROP TRIGGER IF EXISTS students_fts_ad')
+    op.execute('DROP TRIGGER IF EXISTS students_fts_ai')
+    op.execute('DROP TABLE IF EXISTS students_fts')